@@ -17,8 +17,11 @@ import tools.translator
 import tools.processor
 import tools.distributor
 import tools.solver
-import tools.solver
+import tools.runner
+import tools.cache
+import tools.auxiliary
 
+from tools.macros import INFO_DIR
 
 
 def parseArgs(argv):
@@ -36,6 +39,20 @@ def parseArgs(argv):
     parser.add_argument("--runall", help="Run All Operations", required=False)
     parser.add_argument("--runoneexp", help="Run One Experiments", required=False)
     parser.add_argument("--runallexp", help="Run All Experiments", required=False, action="store_true")
+    parser.add_argument("--prepareexp", help="Run One Experiment up to symbolic execution", required=False)
+    parser.add_argument("--checkexp", help="Check the constraints of One Experiment against prepared paths", required=False)
+    parser.add_argument("--jobs", help="Number of experiments run in parallel", required=False, type=int, default=1)
+    parser.add_argument("--workspace", help="Root directory that holds the files of this run", required=False, default=INFO_DIR)
+    parser.add_argument("--no-cache", help="Recompute every stage instead of reusing cached artifacts", required=False, action="store_true")
+    parser.add_argument("--workers", help="Number of symbolic execution worker processes", required=False, type=int, default=1)
+    parser.add_argument("--incremental", help="Solve the branch queries of symbolic execution incrementally", required=False, action="store_true")
+    parser.add_argument("--strategy", help="Order in which symbolic execution explores branches", required=False, choices=["bfs", "dfs", "random-path", "shortest"])
+    parser.add_argument("--time-budget", help="Seconds after which symbolic execution of a function stops and reports the paths found", required=False, type=float)
+    parser.add_argument("--goal-directed", help="Only explore branches on parameters of the documented constraints", required=False, action="store_true")
+    parser.add_argument("--pin-params", help="Run symbolic execution with the documented defaults of parameters no constraint mentions", required=False, action="store_true")
+    parser.add_argument("--check-mode", help="How the solver checks a constraint against the paths of a function: one path at a time, or the tree of their shared prefixes or the disjunction of all of them first", required=False, choices=["paths", "tree", "summary"], default="paths")
+    parser.add_argument("--encode-strings", help="Give z3 the strings of constraints and paths as integers where they are only compared", required=False, action="store_true")
+    parser.add_argument("--timeout", help="Seconds before a step of an experiment group is killed: the preparation shared by the cases of a group, or the check of one case", required=False, type=int, default=30)
     parser.add_argument("--test", help="Run All Experiments", required=False, action="store_true")
 
 
@@ -52,6 +69,25 @@ def parseArgs(argv):
 
 if __name__ in "__main__":
     opts = parseArgs(sys.argv[1:])
+    if opts.no_cache:
+        tools.cache.ENABLED = False
+    if opts.incremental:
+        tools.symexecutor.OPTIONS["incremental"] = True
+    if opts.goal_directed:
+        tools.symexecutor.GOAL_DIRECTED = True
+    if opts.pin_params:
+        tools.translator.PIN_PARAMS = True
+    if opts.check_mode != "paths":
+        tools.solver.CHECK_MODE = opts.check_mode
+    if opts.check_mode == "tree":
+        tools.symexecutor.TREE = True
+    if opts.encode_strings:
+        tools.auxiliary.ENCODE_STRINGS = True
+    if opts.strategy:
+        tools.symexecutor.OPTIONS["strategy"] = opts.strategy
+    if opts.time_budget:
+        tools.symexecutor.OPTIONS["time_budget"] = opts.time_budget
+
     if opts.download:
         print(f"Downloading the project: {opts.download}")
         tools.downloader.download_library(opts.download)
@@ -59,28 +95,28 @@ if __name__ in "__main__":
     
     if opts.extract:
         print(f"Extracting classes and independent functions in the project: {opts.extract}")
-        tools.extractor.extract_class_and_independent_function(opts.extract)
+        tools.extractor.extract_class_and_independent_function(opts.extract, opts.workspace)
         print("Extraction Completed")
 
     if opts.find:
         print(f"Finding all parameters and attributes in the project: {opts.find}")
-        tools.finder.find_params_and_attributes(opts.find)
+        tools.finder.find_params_and_attributes(opts.find, opts.workspace)
         print("Find All")
 
     if opts.match:
         print(f"Checking alignment of parameters' featues and quantities in the project: {opts.match}")
-        tools.matcher.match_alignment(opts.match)
+        tools.matcher.match_alignment(opts.match, opts.workspace)
         print(f"End of match")
     
     if opts.filter:
         print(f"Filtering out files that have no interdependencies in the project: {opts.filter}")
-        tools.filter.filter_params_and_attributes(opts.filter)
+        tools.filter.filter_params_and_attributes(opts.filter, opts.workspace)
         print(f"End of Filter")
 
     if opts.trans:
         print(f"Translate functions in the project: {opts.trans}")
         t1 = time.time()
-        tools.translator.translate_code(opts.trans)
+        tools.translator.translate_code(opts.trans, opts.workspace)
         t2 = time.time()
         print(f"time: {t2-t1}")
         print(f"End of Translation")
@@ -88,133 +124,56 @@ if __name__ in "__main__":
     if opts.symex:
         print(f"Implement symbolic execution on functions in the project: {opts.symex}")
         t1 = time.time()
-        tools.symexecutor.symex(opts.symex)
+        tools.symexecutor.symex(opts.symex, opts.workspace, opts.workers)
         t2 = time.time()
         print(f"time: {t2-t1}")
         print(f"End of Symbolic Execution")
 
     if opts.process:
         print(f"Processing documentation in the project: {opts.process}")
-        tools.processor.process_document(opts.process)
+        tools.processor.process_document(opts.process, opts.workspace)
         print(f"End of Process")
 
     if opts.put:
         print(f"Put GPT processed result files into the project: {opts.put}")
-        tools.distributor.distribute_files(opts.put)
+        tools.distributor.distribute_files(opts.put, opts.workspace)
         print(f"End of Distribution")
     
     if opts.solve:
         print(f"Solve constraints in the project: {opts.solve}")
-        tools.solver.solve_constraints(opts.solve)
+        tools.solver.solve_constraints(opts.solve, opts.workspace)
         print(f"End of Solve")
 
 
     if opts.runall:
         tools.downloader.download_library(opts.runall)
-        tools.extractor.extract_class_and_independent_function(opts.runall)
-        tools.finder.find_params_and_attributes(opts.runall)
-        tools.matcher.match_alignment(opts.runall)
-        tools.filter.filter_params_and_attributes(opts.runall)
-        tools.translator.translate_code(opts.runall)
-        tools.symexecutor.symex(opts.runall)
-        tools.solver.solve_constraints(opts.runall)
-
-
-    def clear_folder(folder_path):
-        if not os.path.exists(folder_path):
-            print(f"Not exist: {folder_path}")
-            return
-
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-            except Exception as e:
-                print(f"Fail to delete {file_path}, the reason is {e}")
+        tools.extractor.extract_class_and_independent_function(opts.runall, opts.workspace)
+        tools.finder.find_params_and_attributes(opts.runall, opts.workspace)
+        tools.matcher.match_alignment(opts.runall, opts.workspace)
+        tools.filter.filter_params_and_attributes(opts.runall, opts.workspace)
+        tools.translator.translate_code(opts.runall, opts.workspace)
+        tools.symexecutor.symex(opts.runall, opts.workspace, opts.workers)
+        tools.solver.solve_constraints(opts.runall, opts.workspace)
+        tools.cache.evict()
+
 
     if opts.runoneexp:
-        clear_folder('./info')
-        tools.extractor.extract_class_and_independent_function(opts.runoneexp)
-        tools.finder.find_params_and_attributes(opts.runoneexp)
-        tools.matcher.match_alignment(opts.runoneexp)
-        tools.filter.filter_params_and_attributes(opts.runoneexp)
-        tools.translator.translate_code(opts.runoneexp)
-        tools.symexecutor.symex(opts.runoneexp)
-        tools.distributor.read_from_benchmark(opts.runoneexp)
-        tools.solver.solve_constraints(opts.runoneexp)
+        tools.runner.prepare_experiment(opts.runoneexp, opts.workspace, opts.workers)
+        tools.runner.check_experiment(opts.runoneexp, opts.workspace)
+        tools.cache.evict()
+
+    if opts.prepareexp:
+        tools.runner.prepare_experiment(opts.prepareexp, opts.workspace, opts.workers)
+        tools.cache.evict()
+
+    if opts.checkexp:
+        tools.runner.check_experiment(opts.checkexp, opts.workspace)
     
     if opts.runallexp:
         t1 = time.time()
-        if not os.path.exists("./logs"):
-            os.makedirs("./logs")
-        for i in range(1, 73):
-            for j in range(0, 3):
-                print(f"===>>> Running experiment c{i}-{j} ===>>>")
-                command = f"python3 main.py --runoneexp c{i}-{j}"
-                print(command, "\n")
-                sub.run(command, shell=True, stdout=open(f"./logs/c{i}-{j}.log", 'w'), stderr=sub.STDOUT, timeout=30)
-           
-        inconsistent = 0
-        consistent = 0
-        fp = 0
-        fn = 0
-
-        result = {}
-        for filename in os.listdir("./logs"):
-            if filename.endswith(".log"):
-                filepath = os.path.join("./logs", filename)
-                with open(filepath, 'rb') as f:
-                    try:
-                        f.seek(-2, os.SEEK_END)
-                        while f.read(1) != b'\n':
-                            f.seek(-2, os.SEEK_CUR)
-                    except OSError:
-                        f.seek(0)
-                    last_line = f.readline().decode().strip()
-                
-                prefix, rest = filename.split('-', 1)
-                id = os.path.splitext(rest)[0]
-                cx = prefix
-    
-                status = not last_line.startswith("BAD CONSTRAINT")
-
-                with open(f"./benchmark.json", "r") as f:
-                    data = json.load(f)
-                oracle_value = next((item['oracle'] for item in data if item['id'] == f"{cx}-{id}"), None)
-                    
-                if status != (oracle_value.lower() == "true"):
-                    if status:
-                        status = "FN"
-                        fn += 1
-                    else:
-                        status = "FP"
-                        fp += 1
-                else:
-                    if status:
-                        consistent += 1
-                    else:
-                        inconsistent += 1
-
-
-                if cx not in result:
-                    result[cx] = {}
-                result[cx][int(id)] = status
-        sorted_keys = sorted(result.keys(), key=lambda x: (x[0], int(x[1:])))
-        df = pd.DataFrame.from_dict({k: result[k] for k in sorted_keys}, orient='index').sort_index(axis=1)
-        df.index.name = "id"
-
-        df.to_excel("result.xlsx")
-
-        print("===>>> Result: ===>>>")
-        print(f"Total: {consistent + inconsistent + fp + fn}")
-        print(f"Consistent: {consistent}")
-        print(f"Inconsistent: {inconsistent}")
-        print(f"False Positive: {fp}")
-        print(f"False Negative: {fn}")
+        tools.runner.run_all_experiments(opts.jobs, opts.timeout, opts.workers)
+        tools.runner.summarize_experiments()
 
         t2 = time.time()
         print(f"time: {t2-t1}")
-        print(f"End of Symbolic Execution")
\ No newline at end of file
+        print(f"End of Symbolic Execution")
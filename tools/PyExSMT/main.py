@@ -1,14 +1,18 @@
 import os
+import json
 import sys
 import logging
-import random
+import threading
 from argparse import ArgumentParser
 
 from pyexsmt import uninterp_func_pair
 from pyexsmt.loader import *
 from pyexsmt.explore import ExplorationEngine
+from pyexsmt.frontier import STRATEGIES
+from pyexsmt.relevance import skippable_lines
 
 from pysmt.shortcuts import *
+from pysmt.environment import Environment, push_env, pop_env
 
 def main():
     sys.path = [os.path.abspath(os.path.join(os.path.dirname(__file__)))] + sys.path
@@ -33,6 +37,16 @@ def main():
                                     help="Limit the depth of paths", default=0)
     parser.add_argument("--solver", dest="solver", action="store", \
                                     help="Choose SMT solver", default="z3")
+    parser.add_argument("--incremental", dest="incremental", action="store_true", \
+                                    help="Keep the solver aligned with the execution tree using push/pop")
+    parser.add_argument("--strategy", dest="strategy", action="store", choices=sorted(STRATEGIES), \
+                                    help="Order in which branches are explored", default="bfs")
+    parser.add_argument("--time-budget", dest="time_budget", type=float, \
+                                    help="Stop exploring after this many seconds and report the paths found", default=0)
+    parser.add_argument("--relevant", dest="relevant", nargs="+", \
+                                    help="Only negate branches that depend on these arguments", default=None)
+    parser.add_argument("--tree", dest="tree", action="store", \
+                                    help="Also write the paths as a JSON tree of shared prefixes to this file", default=None)
     parser.add_argument(dest="file", action="store", help="Select Python file")
     options = parser.parse_args()
 
@@ -51,25 +65,60 @@ def main():
     if options.file == "" or not os.path.exists(options.file):
         parser.error("Missing app to execute")
         sys.exit(1)
-    mapping = replace_str2num(options.file)
 
     if not options.solver in get_env().factory.all_solvers():
         logging.error("Solver %s not available", options.solver)
         sys.exit(-1)
-    else:
-        solver = options.solver
 
-    summary = options.summary
-    filename = os.path.abspath(options.file)
-    app = loaderFactory(filename, options.entry)
+    sys.exit(run(options.file, options.entry, options.solver, options.max_iters, options.max_depth,
+                 options.uninterp, options.dot_graph, options.path, options.summary, options.incremental,
+                 options.strategy, options.time_budget, options.relevant, options.tree))
+
+
+# held by the run of an exploration, which pushes and pops the environment stack of pySMT
+RUN_LOCK = threading.Lock()
+
+
+def run(file, entry, solver="z3", max_iters=0, max_depth=0, uninterp=None,
+        dot_graph=False, path=False, summary=False, incremental=False, strategy="bfs", time_budget=0,
+        relevant=None, tree=None):
+    """
+    Explore the entry function of file and print what was asked for.
+    Returns the exit status of the command line tool, and leaves no module,
+    sys.path entry or pySMT formula behind, so it can be called repeatedly
+    from one process. Calls from several threads are run one after the
+    other: pySMT keeps a single stack of environments for the whole process.
+    """
+    with RUN_LOCK:
+        # explore in a pySMT environment of our own, as fresh as the one of a new
+        # interpreter: node ids decide which models z3 returns, so they must not
+        # depend on earlier runs, and formulas of the caller stay valid
+        env = Environment()
+        env.enable_infix_notation = True
+        push_env(env)
+        try:
+            return _run(file, entry, solver, max_iters, max_depth, uninterp, dot_graph, path,
+                        summary, incremental, strategy, time_budget, relevant, tree)
+        finally:
+            pop_env()
+
+
+def _run(file, entry, solver, max_iters, max_depth, uninterp, dot_graph, path,
+         summary, incremental, strategy, time_budget, relevant, tree):
+    filename = os.path.abspath(file)
+    skippable = set()
+    if relevant is not None:
+        skippable = {(filename, line) for line in skippable_lines(filename, entry, relevant)}
+    app = loaderFactory(filename, entry)
     if app is None:
-        sys.exit(1)
+        return 1
 
-    funcs = uninterp_func_pair(options.uninterp, app.get_file())
     result = None
     try:
-        engine = ExplorationEngine(app.create_invocation(), solver=solver)
-        result_struct = engine.explore(options.max_iters, options.max_depth, funcs)
+        funcs = uninterp_func_pair(uninterp)
+        engine = ExplorationEngine(app.create_invocation(), solver=solver, incremental=incremental, strategy=strategy)
+        result_struct = engine.explore(max_iters, max_depth, funcs, time_budget=time_budget,
+                                       relevant=relevant, skippable=skippable)
         return_vals = result_struct.execution_return_values
         result = app.execution_complete(return_vals)
 
@@ -77,50 +126,26 @@ def main():
             summary = result_struct.to_summary()
             print("\nSummary:\n%s\n" % summary)
 
-        if options.dot_graph:
-            result_struct.to_dot(filename, mapping)
+        if dot_graph:
+            result_struct.to_dot(filename, app.literals)
 
-        if options.path:
-            result_struct.to_path(filename, mapping)
+        if path:
+            result_struct.to_path(filename, app.literals)
 
-        replace_num2str(options.file, mapping)
+        if tree:
+            with open(tree, 'w') as f:
+                json.dump(result_struct.to_tree(app.literals), f)
 
     except (ImportError, NotImplementedError, TypeError) as error:
         logging.error(error)
-        sys.exit(1)
+        return 1
+    finally:
+        if os.path.dirname(filename) in sys.path:
+            sys.path.remove(os.path.dirname(filename))
     if result is None or result:
-        sys.exit(0)
+        return 0
     else:
-        sys.exit(1)
-
-
-def replace_str2num(file):
-    with open(file, 'r') as f:
-        content = f.read()
-    strings = re.findall(r"'(.*?)'", content)
-    strings = list(set(strings))
-    mapping = {}
-
-    for string in strings:
-        random_number = random.randint(10000, 99999)
-        if random_number in mapping.values():
-            random_number = random.randint(10000, 99999)
-        mapping[string] = random_number
-        content = content.replace(f"'{string}'", str(random_number))
-
-    with open(file, 'w') as f:
-        f.write(content)
-
-    return mapping
-
-def replace_num2str(file, mapping):
-    with open(file, 'r') as f:
-        content = f.read()  
-    for key, value in mapping.items():
-        content = content.replace(str(value), f"'{key}'")
-    with open(file, 'w') as f:
-        f.write(content)
-
+        return 1
 
 
 if __name__ == "__main__":
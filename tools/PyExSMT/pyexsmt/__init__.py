@@ -56,17 +56,16 @@ def parse_types(type_list):
         \nSupported types are:%s", type_list, list(TYPES.keys()))
         sys.exit(-1)
 
-def uninterp_func_pair(definition, module):
+def uninterp_func_pair(definition):
     '''
     definition : [name : String, return_type : String, argument_types : String]
     argument_types matches "[<Type>,<Type>,...]"
 
-    returns a pair where the first element is the concrete function we want to replace
-    and the second element is the symbolic function we want to plug in
+    returns a pair where the first element is the name of the concrete function of the
+    loaded module we want to replace and the second element is the symbolic function we want to plug in
     '''
     funcs = []
     if not definition is None:
-        module_func = module+"."+definition[0]
         func_types = parse_types(definition[1:])
         ftype = FunctionType(*func_types)
         f = Symbol(definition[0], ftype)
@@ -82,7 +81,7 @@ def uninterp_func_pair(definition, module):
             except Exception:
                 logging.error("Failed to call %s of type %s with args %s.", f, ftype, [a.get_type() for a in args])
                 sys.exit(-1)
-        funcs = [(module_func, wrapper)]
+        funcs = [(definition[0], wrapper)]
     return funcs
 
 def get_symbolic_from_expr(expr):
@@ -1,11 +1,15 @@
 # Copyright: see copyright.txt
 
 import logging
+import itertools
 
 class Constraint:
-    cnt = 0
     """A constraint is a list of predicates leading to some specific
        position in the code."""
+    # an exploration can make tens of thousands of them
+    __slots__ = ("inputs", "predicate", "effect", "processed", "parent", "children",
+                 "index", "depth", "cnt", "id")
+
     def __init__(self, parent, last_predicate):
         self.inputs = None
         self.predicate = last_predicate
@@ -13,8 +17,12 @@ class Constraint:
         self.processed = False
         self.parent = parent
         self.children = []
-        self.id = self.__class__.cnt
-        self.__class__.cnt += 1
+        # the children by the key of their predicate, made with the first child
+        self.index = None
+        self.depth = 0 if parent is None else parent.depth + 1
+        # constraints are numbered within their tree, which is one exploration
+        self.cnt = itertools.count() if parent is None else parent.cnt
+        self.id = next(self.cnt)
 
     def __eq__(self, other):
         """Two Constraints are equal iff they have the same chain of predicates"""
@@ -43,9 +51,7 @@ class Constraint:
         return asserts
 
     def get_length(self):
-        if self.parent == None:
-            return 0
-        return 1 + self.parent.get_length()
+        return self.depth
 
     def __str__(self):
         return str(self.predicate) + "  (processed: %s, path_len: %d)" % (self.processed,self.get_length())
@@ -57,14 +63,16 @@ class Constraint:
         return s
 
     def find_child(self, predicate):
-        for c in self.children:
-            if predicate == c.predicate:
-                return c
-        return None
+        if self.index is None:
+            return None
+        return self.index.get(predicate.key())
 
     def add_child(self, predicate):
         assert(self.find_child(predicate) is None)
         c = Constraint(self, predicate)
         self.children.append(c)
+        if self.index is None:
+            self.index = {}
+        self.index[predicate.key()] = c
         return c
 
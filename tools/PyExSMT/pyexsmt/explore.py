@@ -1,18 +1,20 @@
 # Copyright: see copyright.txt
 
-from collections import deque
 import logging
+import time
 
 from pyexsmt.path_to_constraint import PathToConstraint
 from pyexsmt import pred_to_smt
 from pyexsmt.symbolic_types import symbolic_object
 from pyexsmt.result import Result
+from pyexsmt.model import ModelSnapshot
+from pyexsmt.frontier import STRATEGIES
 
 from pysmt.shortcuts import *
 
 
 class ExplorationEngine:
-    def __init__(self, funcinv, solver="z3"):
+    def __init__(self, funcinv, solver="z3", incremental=False, strategy="bfs"):
         self.invocation = funcinv
         # the input to the function
         self.symbolic_inputs = {}  # string -> SymbolicObject
@@ -20,17 +22,17 @@ class ExplorationEngine:
         for n in funcinv.get_names():
             self.symbolic_inputs[n] = funcinv.create_arg_value(n)
 
-        self.constraints_to_solve = deque([])
+        self.constraints_to_solve = STRATEGIES[strategy]()
         self.num_processed_constraints = 0
 
         self.path = PathToConstraint(lambda c : self.add_constraint(c))
-        # link up SymbolicObject to PathToConstraint in order to intercept control-flow
-        symbolic_object.SymbolicObject.SI = self.path
 
         self.solver = Solver(solver)
         self.solver.solve() # generate initial values
-        # link up SymbolicObject to the Solver to get concrete values during execution
-        symbolic_object.SymbolicObject.SOLVER = self.solver 
+        # in incremental mode the solver holds one pushed level per predicate
+        # on the path from the root to the constraints in asserted
+        self.incremental = incremental
+        self.asserted = []
 
         # outputs
         self.result = Result(self.path)
@@ -39,9 +41,13 @@ class ExplorationEngine:
         logging.debug("ADDING CONSTRAINT: %s", repr(constraint))
         self.constraints_to_solve.append(constraint)
 
-    def explore(self, max_iterations=0, max_depth=0, funcs=[], mod=None):
+    def explore(self, max_iterations=0, max_depth=0, funcs=[], mod=None, time_budget=0,
+                relevant=None, skippable=set()):
         self.path.max_depth = max_depth
         self.path.mod = mod
+        self.path.relevant = None if relevant is None else set(relevant)
+        self.path.skippable = skippable
+        deadline = time.monotonic() + time_budget
 
         self._one_execution(funcs)
         
@@ -51,13 +57,21 @@ class ExplorationEngine:
             return self.result
 
         while not self._is_exploration_complete():
-            selected = self.constraints_to_solve.popleft()
+            if time_budget != 0 and time.monotonic() >= deadline:
+                logging.debug("Time budget of %ss exhausted, terminating", time_budget)
+                break
+
+            selected = self.constraints_to_solve.pop()
             if selected.processed:
                 continue		
 
             logging.debug("SELECTED CONSTRAINT: %s", repr(selected))
-            asserts, query = selected.get_asserts_and_query()
-            self._find_counterexample(asserts, query)
+            if self.incremental:
+                selected.processed = True
+                self._find_counterexample_incremental(selected)
+            else:
+                asserts, query = selected.get_asserts_and_query()
+                self._find_counterexample(asserts, query)
 
             if not self.solver.last_result:
                 continue
@@ -88,22 +102,58 @@ class ExplorationEngine:
     def _one_execution(self, funcs=[], expected_path=None):
         logging.debug("EXPECTED PATH: %s", expected_path)
 
-        self.result.record_inputs(self.symbolic_inputs)
-        logging.info("USING INPUTS: %s", self.result.generated_inputs[-1])
+        # link up SymbolicObject to PathToConstraint in order to intercept control-flow,
+        # and to the solver to get concrete values; the model stays the same until the
+        # next query, so its values are read once
+        engine = symbolic_object.EngineContext(self.path, self.solver, ModelSnapshot(self.solver))
+        token = symbolic_object.ENGINE.set(engine)
+        try:
+            self.result.record_inputs(self.symbolic_inputs)
+            logging.info("USING INPUTS: %s", self.result.generated_inputs[-1])
 
-        self.path.reset(expected_path)
+            self.path.reset(expected_path)
 
-        try:
-            ret = self.invocation.call_function(self.symbolic_inputs, funcs)
-        except Exception:
-            ret = None
+            try:
+                ret = self.invocation.call_function(self.symbolic_inputs, funcs)
+            except Exception:
+                ret = None
 
-        logging.debug("CURRENT CONSTARINT: %s", repr(self.path.current_constraint))
-        logging.info("RETURN: %s", ret)
+            logging.debug("CURRENT CONSTARINT: %s", repr(self.path.current_constraint))
+            logging.info("RETURN: %s", ret)
 
-        self.result.record_output(ret)
+            self.result.record_output(ret)
+        finally:
+            symbolic_object.ENGINE.reset(token)
 
     def _find_counterexample(self, asserts, query):
         assumptions = [pred_to_smt(p) for p in asserts] + [Not(pred_to_smt(query))]
         logging.debug("SOLVING: %s", assumptions)
         self.solver.solve(assumptions)
+
+    def _find_counterexample_incremental(self, selected):
+        """
+        Move the solver context to the parent of selected, popping the
+        predicates that are not on its path and pushing only the new ones,
+        then solve for the negation of its predicate.
+        """
+        ancestors = []
+        tmp = selected.parent
+        while tmp.predicate is not None:
+            ancestors.append(tmp)
+            tmp = tmp.parent
+        ancestors.reverse()
+
+        common = 0
+        while common < min(len(ancestors), len(self.asserted)) and ancestors[common] is self.asserted[common]:
+            common += 1
+        for _ in range(len(self.asserted) - common):
+            self.solver.pop()
+        del self.asserted[common:]
+        for c in ancestors[common:]:
+            self.solver.push()
+            self.solver.add_assertion(pred_to_smt(c.predicate))
+            self.asserted.append(c)
+
+        query = Not(pred_to_smt(selected.predicate))
+        logging.debug("SOLVING: %s under %d asserted predicates", query, len(self.asserted))
+        self.solver.solve([query])
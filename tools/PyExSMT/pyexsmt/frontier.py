@@ -0,0 +1,89 @@
+# Copyright: see copyright.txt
+
+import heapq
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+
+class Frontier(ABC):
+    """The constraints that are still to be negated, in the order
+       in which an exploration strategy wants to solve them."""
+    @abstractmethod
+    def append(self, constraint):
+        pass
+
+    @abstractmethod
+    def pop(self):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+class BreadthFirstFrontier(Frontier):
+    def __init__(self):
+        self.queue = deque([])
+
+    def append(self, constraint):
+        self.queue.append(constraint)
+
+    def pop(self):
+        return self.queue.popleft()
+
+    def __len__(self):
+        return len(self.queue)
+
+class DepthFirstFrontier(Frontier):
+    def __init__(self):
+        self.stack = []
+
+    def append(self, constraint):
+        self.stack.append(constraint)
+
+    def pop(self):
+        return self.stack.pop()
+
+    def __len__(self):
+        return len(self.stack)
+
+class RandomPathFrontier(Frontier):
+    """Picks a constraint with probability 2^-depth, which is the chance
+       of reaching it by flipping a coin at every branch from the root."""
+    def __init__(self, seed=0):
+        self.constraints = []
+        self.random = random.Random(seed)
+
+    def append(self, constraint):
+        self.constraints.append(constraint)
+
+    def pop(self):
+        weights = [2.0 ** -c.get_length() for c in self.constraints]
+        i = self.random.choices(range(len(self.constraints)), weights)[0]
+        self.constraints[i], self.constraints[-1] = self.constraints[-1], self.constraints[i]
+        return self.constraints.pop()
+
+    def __len__(self):
+        return len(self.constraints)
+
+class ShortestFirstFrontier(Frontier):
+    """Negates the shallowest uncovered branch first, oldest first on ties."""
+    def __init__(self):
+        self.heap = []
+        self.count = 0
+
+    def append(self, constraint):
+        heapq.heappush(self.heap, (constraint.get_length(), self.count, constraint))
+        self.count += 1
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+STRATEGIES = {
+    "bfs": BreadthFirstFrontier,
+    "dfs": DepthFirstFrontier,
+    "random-path": RandomPathFrontier,
+    "shortest": ShortestFirstFrontier,
+}
@@ -4,20 +4,22 @@ from contextlib import ExitStack
 from mock import patch
 
 class FunctionInvocation:
-    def __init__(self, function, reset):
+    def __init__(self, function, reset, module):
         self.function = function
         self.reset = reset
+        # the module the function is in, as it is after a reset
+        self.module = module
         self.arg_constructor = {}
 
     def call_function(self, args, funcs=[]):
         '''
         funcs should be a list of pairs. 
-        Left element is a concrete function
+        Left element is the name of a concrete function of the module
         right element is the symbolic replacement
         '''
         self.reset()
         with ExitStack() as stack:
-            [stack.enter_context(patch(cf, lf, create=True)) for cf, lf in funcs]
+            [stack.enter_context(patch.object(self.module(), cf, lf, create=True)) for cf, lf in funcs]
             ret = self.function(**args)
         return ret
 
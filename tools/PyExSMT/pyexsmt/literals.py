@@ -0,0 +1,68 @@
+# Copyright: see copyright.txt
+
+import ast
+import re
+
+# the first id given to a string, and the distance between two ids, so that
+# a model value next to the id of one string is not the id of another
+FIRST_ID = 10000
+ID_STEP = 10
+
+NUMBER = re.compile(r"(?<![\w.])\d+(?![\w.])")
+
+class LiteralTable(ast.NodeTransformer):
+    """The string literals of a module as the integers the symbolic
+       integers of the engine can compare, and the way back from those
+       integers to the literals when paths are printed.
+
+       A string gets its id in the order it first appears in the module,
+       skipping the numbers the module itself uses, so the same file always
+       gets the same ids and no id stands for two things. The strings of
+       f-strings stay as they are, and so does a string whose attributes
+       are used, such as ' '.join."""
+    def __init__(self, tree):
+        self.ids = {}
+        self.strings = {}
+        self.taken = {node.value for node in ast.walk(tree)
+                      if isinstance(node, ast.Constant) and type(node.value) in (int, float)}
+        self.next_id = FIRST_ID
+
+    def intern(self, string):
+        if string not in self.ids:
+            while self.next_id in self.taken:
+                self.next_id += ID_STEP
+            self.ids[string] = self.next_id
+            # in single quotes, the way the literal is written in the source; repr
+            # picks double quotes for a string with an apostrophe and no double quote
+            text = repr(string)
+            if text[0] == '"':
+                text = "'%s'" % text[1:-1].replace("'", "\\'")
+            self.strings[self.next_id] = text
+            self.next_id += ID_STEP
+        return self.ids[string]
+
+    def render(self, text):
+        """Put the literals back in text, in place of the whole numbers that are their ids."""
+        return NUMBER.sub(lambda m: self.strings.get(int(m.group()), m.group()), text)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, str):
+            return ast.copy_location(ast.Constant(self.intern(node.value)), node)
+        return node
+
+    def visit_JoinedStr(self, node):
+        for value in node.values:
+            if isinstance(value, ast.FormattedValue):
+                self.visit(value)
+        return node
+
+    def visit_Attribute(self, node):
+        if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            return node
+        return self.generic_visit(node)
+
+def intern_literals(tree, filename):
+    """Return the code of the module tree with its string literals interned, and their table."""
+    table = LiteralTable(tree)
+    tree = ast.fix_missing_locations(table.visit(tree))
+    return compile(tree, filename, "exec", dont_inherit=True), table
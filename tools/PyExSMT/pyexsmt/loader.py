@@ -1,21 +1,29 @@
 # Copyright: copyright.txt
 
+import ast
 import logging
 import inspect
 import re
 import os
 import sys
-import builtins
+import types
 from pyexsmt.invocation import FunctionInvocation
 from pyexsmt.symbolic_types import SymbolicInteger, get_symbolic
+from pyexsmt.literals import intern_literals
 
 # The built-in definition of len wraps the return value in an int()
 # constructor, destroying any symbolic types.
-# By redefining len here we can preserve symbolic integer types.
-builtins.len = (lambda x: x.__len__())
+# By redefining len in the globals of the loaded module we can preserve
+# symbolic integer types, without changing len for the rest of the process.
+def _len(x):
+    return x.__len__()
 
 class Loader:
     def __init__(self, filename, entry):
+        self._path = os.path.abspath(filename)
+        self._code = None
+        self._isolate = True
+        self.literals = None
         self._file_name = os.path.basename(filename)
         self._file_name = self._file_name[:-3]
         if (entry == ""):
@@ -31,7 +39,7 @@ class Loader:
         return self._entry_point
     
     def create_invocation(self):
-        inv = FunctionInvocation(self._execute,self._reset_callback)
+        inv = FunctionInvocation(self._execute,self._reset_callback,lambda: self.app)
         func = self.app.__dict__[self._entry_point]
         argspec = inspect.signature(func)
         # check to see if user specified initial values of arguments
@@ -76,19 +84,34 @@ class Loader:
     # -- private
 
     def _reset_callback(self,firstpass=False):
+        # the module is only run again when an execution can leave something behind in it
+        if not firstpass and self.app is not None and not self._isolate:
+            return
         self.app = None
-        if firstpass and self._file_name in sys.modules:
-            raise ImportError("There already is a module loaded named " + self._file_name)
         try:
-            if not firstpass and self._file_name in sys.modules:
-                del sys.modules[self._file_name]
-            self.app = __import__(self._file_name)
+            self.app = self._import()
             if not self._entry_point in self.app.__dict__ or not callable(self.app.__dict__[self._entry_point]):
                 raise ImportError("File %s.py doesn't contain a function named %s"
                                   % (self._file_name, self._entry_point))
         except Exception as arg:
             raise ImportError("Couldn't import " + self._file_name + "\n" + arg)
 
+    def _import(self):
+        if self._code is None:
+            # the file is compiled once, with its string literals interned in memory,
+            # so it is never rewritten and can be explored by several processes at once
+            with open(self._path, 'r') as f:
+                tree = ast.parse(f.read(), self._path)
+            self._isolate = _keeps_state(tree)
+            self._code, self.literals = intern_literals(tree, self._path)
+        # the module is kept out of sys.modules, so loaders of files with the same name
+        # do not replace each other's module
+        module = types.ModuleType(self._file_name)
+        module.__file__ = self._path
+        module.len = _len
+        exec(self._code, module.__dict__)
+        return module
+
     def _execute(self, **args):
         return self.app.__dict__[self._entry_point](**args)
 
@@ -116,6 +139,31 @@ def loaderFactory(filename, entry):
         sys.path = sys.path[1:]
         return None
 
+def _keeps_state(tree):
+    """Whether executing a function of the module can change what the next
+       execution finds in the module: it holds more than functions, a
+       function has a default value that is not a constant, or a function
+       rebinds or reaches its globals other than by name."""
+    for stmt in tree.body:
+        if isinstance(stmt, (ast.FunctionDef, ast.Import, ast.ImportFrom)):
+            continue
+        if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
+            continue
+        # such as the concrete_args of a function
+        if isinstance(stmt, ast.Assign) and all(isinstance(t, ast.Attribute) for t in stmt.targets):
+            continue
+        return True
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Global):
+            return True
+        # a default value is made once and shared by every call
+        if isinstance(node, ast.arguments) and \
+                any(not isinstance(d, ast.Constant) for d in node.defaults + node.kw_defaults if d is not None):
+            return True
+        if isinstance(node, ast.Name) and node.id in ("globals", "vars", "exec", "eval"):
+            return True
+    return False
+
 def _to_bag(l):
     bag = {}
     for i in l:
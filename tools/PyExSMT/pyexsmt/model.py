@@ -0,0 +1,84 @@
+# Copyright: see copyright.txt
+
+import z3
+import pysmt.operators as op
+
+from pysmt.shortcuts import INT, BOOL
+
+# the node types ModelSnapshot evaluates itself, from the values of their arguments
+EVALUATED = frozenset([op.AND, op.OR, op.NOT, op.IMPLIES, op.IFF, op.EQUALS, op.LE, op.LT,
+                       op.PLUS, op.MINUS, op.TIMES, op.ITE])
+
+class ModelSnapshot:
+    """The current model of the solver, for the duration of one concolic
+       execution. A variable is read from the model once, and expressions
+       are evaluated against those values in Python, each node once, rather
+       than asking the solver again for every condition the execution
+       tests. Nodes it has no rule for are still evaluated by the solver."""
+    def __init__(self, solver):
+        self.solver = solver
+        self.values = {}
+        # reading variables straight from the z3 model saves converting the values back to pySMT
+        self.model = solver.z3.model() if hasattr(solver, "z3") else None
+
+    def get_py_value(self, expr):
+        values = self.values
+        if expr in values:
+            return values[expr]
+        # expressions built up in loops can be deeper than the recursion limit
+        stack = [expr]
+        while stack:
+            node = stack[-1]
+            if node in values:
+                stack.pop()
+                continue
+            if node.node_type() in EVALUATED:
+                pending = [arg for arg in node.args() if arg not in values]
+                if pending:
+                    stack.extend(pending)
+                    continue
+            stack.pop()
+            values[node] = self._evaluate(node)
+        return values[expr]
+
+    def _evaluate(self, node):
+        t = node.node_type()
+        if t == op.SYMBOL:
+            return self._variable(node)
+        if t == op.INT_CONSTANT or t == op.BOOL_CONSTANT:
+            return node.constant_value()
+        if t not in EVALUATED:
+            return self.solver.get_py_value(node)
+        args = [self.values[arg] for arg in node.args()]
+        if t == op.AND:
+            return all(args)
+        if t == op.OR:
+            return any(args)
+        if t == op.NOT:
+            return not args[0]
+        if t == op.IMPLIES:
+            return not args[0] or args[1]
+        if t == op.IFF or t == op.EQUALS:
+            return args[0] == args[1]
+        if t == op.LE:
+            return args[0] <= args[1]
+        if t == op.LT:
+            return args[0] < args[1]
+        if t == op.PLUS:
+            return sum(args)
+        if t == op.MINUS:
+            return args[0] - args[1]
+        if t == op.TIMES:
+            product = 1
+            for arg in args:
+                product *= arg
+            return product
+        return args[1] if args[0] else args[2]
+
+    def _variable(self, node):
+        if self.model is None or node.symbol_type() not in (INT, BOOL):
+            return self.solver.get_py_value(node)
+        value = self.model.eval(self.solver.converter.convert(node), model_completion=True)
+        if node.symbol_type() == INT:
+            return value.as_long()
+        return z3.is_true(value)
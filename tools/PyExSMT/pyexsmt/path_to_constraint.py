@@ -1,6 +1,7 @@
 # Copyright: see copyright.txt
 
 import logging
+import sys
 
 from pyexsmt.predicate import Predicate
 from pyexsmt.constraint import Constraint
@@ -17,6 +18,10 @@ class PathToConstraint:
         self.expected_path = None
         self.max_depth = 0
         self.mod = None
+        # names of the inputs whose branches are worth negating, None for all,
+        # and the (file, line) of tests whose outcome cannot matter for them
+        self.relevant = None
+        self.skippable = set()
 
     def reset(self,expected):
         self.current_constraint = self.root_constraint
@@ -45,15 +50,20 @@ class PathToConstraint:
         c = self.current_constraint.find_child(p)
 
         if c is None:
-            asserts = [pred_to_smt(p) for p in self.current_constraint.get_asserts()]
-            if self.mod is not None and not is_sat(And(self.mod, pred_to_smt(p), *asserts)):
-                logging.debug("Path pruned by mod (%s): %s %s", self.mod, c, p)
-                return
+            if self.mod is not None:
+                asserts = [pred_to_smt(p) for p in self.current_constraint.get_asserts()]
+                if not is_sat(And(self.mod, pred_to_smt(p), *asserts)):
+                    logging.debug("Path pruned by mod (%s): %s %s", self.mod, c, p)
+                    return
             c = self.current_constraint.add_child(p)
 
-            # we add the new constraint to the queue of the engine for later processing
-            logging.debug("New constraint: %s", c)
-            self.add(c)
+            # we add the new constraint to the queue of the engine for later processing,
+            # unless its other side cannot tell anything about the relevant inputs
+            if self.relevant is None or self.is_relevant(p) or not self.is_skippable():
+                logging.debug("New constraint: %s", c)
+                self.add(c)
+            else:
+                logging.debug("Irrelevant constraint not negated: %s", c)
             
         # check for path mismatch
         # IMPORTANT: note that we don't actually check the predicate is the
@@ -77,3 +87,14 @@ class PathToConstraint:
             logging.debug("Processed constraint: %s", c)
 
         self.current_constraint = c
+
+    def is_relevant(self, predicate):
+        return any(v.symbol_name() in self.relevant for v in get_free_variables(predicate.symtype.expr))
+
+    def is_skippable(self):
+        frame = sys._getframe(1)
+        while frame is not None:
+            if (frame.f_code.co_filename, frame.f_lineno) in self.skippable:
+                return True
+            frame = frame.f_back
+        return False
@@ -3,19 +3,25 @@
 class Predicate:
     """Predicate is one specific ``if'' encountered during the program execution.
        """
+    __slots__ = ("symtype", "result")
+
     def __init__(self, st, result):
         self.symtype = st
         self.result = result
 
+    def key(self):
+        """The id of the pySMT node of the predicate, which pySMT shares
+           between equal expressions, and its result."""
+        return self.symtype.expr.node_id(), self.result
+
     def __eq__(self, other):
         if isinstance(other, Predicate):
-            res = self.result == other.result and self.symtype.symbolic_eq(other.symtype)
-            return res
+            return self.key() == other.key()
         else:
             return False
 
     def __hash__(self):
-        return hash(self.symtype)
+        return hash(self.key())
 
     def __str__(self):
         return "%s (%s)" % (repr(self.symtype), self.result)
@@ -0,0 +1,51 @@
+# Copyright: see copyright.txt
+
+import ast
+
+def skippable_lines(filename, entry, relevant):
+    """Return the lines of the if and while tests in function entry of
+       filename whose outcome cannot matter for the relevant arguments:
+       the test does not name one of them, and neither side of the
+       statement names one or leaves the straight-line flow of the
+       function (return, raise, break, continue)."""
+    try:
+        with open(filename, 'r') as f:
+            tree = ast.parse(f.read())
+    except SyntaxError:
+        # the loader reports it when importing the file
+        return set()
+    lines = set()
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == entry:
+            relevant = _related(node, relevant)
+            for stmt in ast.walk(node):
+                if isinstance(stmt, (ast.If, ast.While)) and not _matters(stmt, relevant):
+                    lines.update(range(stmt.test.lineno, stmt.test.end_lineno + 1))
+    return lines
+
+def _related(func, relevant):
+    """Close relevant over the names that are tested together with it,
+       so that statements assigning those names are not skipped either."""
+    relevant = set(relevant)
+    tests = [n.test for n in ast.walk(func) if isinstance(n, (ast.If, ast.While))]
+    changed = True
+    while changed:
+        changed = False
+        for test in tests:
+            names = {n.id for n in ast.walk(test) if isinstance(n, ast.Name)}
+            if names & relevant and not names <= relevant:
+                relevant |= names
+                changed = True
+    return relevant
+
+def _matters(stmt, relevant):
+    for node in ast.walk(stmt):
+        if isinstance(node, (ast.Return, ast.Raise, ast.Break, ast.Continue)):
+            return True
+        if isinstance(node, ast.Name) and node.id in relevant:
+            return True
+        # error returns name the arguments they depend on, e.g. '(a)_(b)_ERROR_END'
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) \
+                and any("(%s)" % r in node.value for r in relevant):
+            return True
+    return False
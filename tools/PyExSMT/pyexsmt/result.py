@@ -1,7 +1,6 @@
 import re
 import logging
 from graphviz import Source
-import pygraphviz as pgv
 
 from pyexsmt import pred_to_smt, get_concr_value, match_smt_type
 from pyexsmt.symbolic_types import SymbolicObject
@@ -29,15 +28,13 @@ class Result(object):
             ret = ret.get_concr_value()
         self.execution_return_values.append(ret)
 
-    def to_dot(self, filename, mapping):
+    def to_dot(self, filename, literals):
         header = "digraph {\n"
         footer = "}\n"
         if self.list_rep is None:
             self.list_rep = self._to_list_rep(self.path.root_constraint)
         dot = self._to_dot(self.list_rep)
-        dot = header + dot + footer
-        for key, value in mapping.items():
-            dot = dot.replace(str(value), f"'{key}'")
+        dot = literals.render(header + dot + footer)
         s = Source(dot, filename=filename+".dot", format="png")
         s.view()
 
@@ -67,118 +64,121 @@ class Result(object):
         else:
             return ""
 
-    def to_path(self, filename, mapping):
-        header = "digraph {\n"
-        footer = "}\n"
-        if self.list_rep is None:
-            self.list_rep = self._to_list_rep(self.path.root_constraint)        
-        dot = self._to_path(self.list_rep)
-        dot = header + dot + footer
-        for key, value in mapping.items():
-            dot = dot.replace(str(value), f"'{key}'")
-        graph = pgv.AGraph(dot)
-        node_indices = {node: i for i, node in enumerate(graph.nodes())}
-        start_node = list(graph.nodes())[0]
-        paths = []
-        self.extract_paths(graph, start_node, [(start_node, None)], paths)
-        for path in paths:                
-            formatted_path = " -> ".join(f"{node.get_name()[:-(len(str(node_indices[node])))]} ({'True' if condition else 'False'})" for node, condition in path)
-            parts = formatted_path.split("->")
-            result = []
-            for part in parts:
-                match = re.match(r"\((.*?)\) \((True|False)\)", part.strip())
+    def to_path(self, filename, literals):
+        for path in self.formatted_paths(literals):
+            print(path)
+
+    def to_tree(self, literals):
+        """
+        Return the paths printed by to_path as a tree in which paths share
+        the nodes of their common prefix. A node maps each condition that can
+        follow it to a child node, and the node a path ends in lists the
+        index of its line under "lines". The conditions of a path are split
+        on " -> " like the paths are split by the solver.
+        """
+        root = {"children": {}}
+        for line, path in enumerate(self.formatted_paths(literals)):
+            node = root
+            for part in path.split(" -> "):
+                node = node["children"].setdefault(part, {"children": {}})
+            node.setdefault("lines", []).append(line)
+        return root
+
+    def formatted_paths(self, literals):
+        """Yield the lines to_path prints, with the ids of the string literals put back as strings."""
+        for path in self.iter_paths(self.path.root_constraint):
+            nodes = [(literals.render(label), condition) for label, condition in path]
+            yield self._format_path(nodes)
+
+    def iter_paths(self, node, path=(), condition=False):
+        """
+        Yield every root to leaf path of the execution tree below node as soon
+        as it is found, as a tuple of (label, condition) pairs. A node is
+        labelled with the predicate of its true child, or of its only child,
+        and a leaf with its effect; condition is True when the node is the
+        true child, or the only child, of its parent. Leaves without an effect
+        are left out, as in to_dot.
+        """
+        children = node.children
+        if len(children) == 2:
+            if not children[0].predicate.symtype.symbolic_eq(children[1].predicate.symtype):
+                raise ValueError("Two children of a constraint should have the same predicate!")
+            left = children[0] if children[0].predicate.result else children[1]
+            right = children[1] if not children[1].predicate.result else children[0]
+            branches = [(left, True), (right, False)]
+        elif len(children) == 1:
+            branches = [(children[0], True)]
+        elif len(children) == 0:
+            if node.effect is not None:
+                yield path + ((str(to_pysmt(node.effect)), condition),)
+            return
+        else:
+            raise ValueError("Should not be possible! Can't have more than two children.")
+
+        path = path + ((str(pred_to_smt(branches[0][0].predicate)), condition),)
+        found = False
+        for child, child_condition in branches:
+            for child_path in self.iter_paths(child, path, child_condition):
+                found = True
+                yield child_path
+        if not found:
+            yield path
+
+    def _format_path(self, nodes):
+        formatted_path = " -> ".join(f"{label} ({'True' if condition else 'False'})" for label, condition in nodes)
+        parts = formatted_path.split("->")
+        result = []
+        for part in parts:
+            match = re.match(r"\((.*?)\) \((True|False)\)", part.strip())
+            if match:
+                result.append((match.group(1), match.group(2)))
+            else:
+                match = re.match(r"(.*?) \((True|False)\)", part.strip())
                 if match:
-                    result.append((match.group(1), match.group(2)))
-                else:
-                    match = re.match(r"(.*?) \((True|False)\)", part.strip())
-                    if match:
-                        result.append((match.group(1).strip(), match.group(2)))
-
-            def adjust(condition, flag):
-                if condition.isnumeric():
-                    return condition
-                if not ((flag == 'True') ^ (condition.startswith("!"))):
-                    if '!=' in condition:
-                        adjusted_condition = condition.strip(" ()!").replace('!=', '=')
-                    elif '==' in condition:
-                        adjusted_condition = condition.strip(" ()!").replace('==', '!=')
-                    elif '<=' in condition:
-                        adjusted_condition = condition.strip(" ()!").replace('<=', '>')
-                    elif '>=' in condition:
-                        adjusted_condition = condition.strip(" ()!").replace('>=', '<')
-                    elif '<' in condition:
-                        adjusted_condition = condition.strip(" ()!").replace('<', '>=')
-                    elif '>' in condition:
-                        adjusted_condition = condition.strip(" ()!").replace('>', '<=')
-                    else:
-                        adjusted_condition = condition.strip(" ()!").replace('=', '!=')
+                    result.append((match.group(1).strip(), match.group(2)))
+
+        def adjust(condition, flag):
+            if condition.isnumeric():
+                return condition
+            if not ((flag == 'True') ^ (condition.startswith("!"))):
+                if '!=' in condition:
+                    adjusted_condition = condition.strip(" ()!").replace('!=', '=')
+                elif '==' in condition:
+                    adjusted_condition = condition.strip(" ()!").replace('==', '!=')
+                elif '<=' in condition:
+                    adjusted_condition = condition.strip(" ()!").replace('<=', '>')
+                elif '>=' in condition:
+                    adjusted_condition = condition.strip(" ()!").replace('>=', '<')
+                elif '<' in condition:
+                    adjusted_condition = condition.strip(" ()!").replace('<', '>=')
+                elif '>' in condition:
+                    adjusted_condition = condition.strip(" ()!").replace('>', '<=')
                 else:
-                    adjusted_condition = condition.strip(" ()!")
-                
-                return f"({adjusted_condition})"
-
-            modified_list = []
-            for i in range(0, len(result)-1):
-                condition = result[i][0]
-                flag = result[i+1][1]
-                modified_list.append(adjust(condition, flag))
-        
-            
-            if "=" in result[-1][0] and "^" not in result[-1][0]:
-                condition = result[-1][0]
-                flag = 'False' if condition.count("!") % 2 == 0 else 'True'
-                modified_list.append(adjust(condition, flag))
+                    adjusted_condition = condition.strip(" ()!").replace('=', '!=')
             else:
-                modified_list.append(result[-1][0])
-
-            print(" -> ".join(modified_list))
-
-
-    def extract_paths(self, graph, node, path, paths):
-        successors = graph.successors(node)
-        if not successors:
-            paths.append(path)
-            return
-        for successor in successors:
-            edge = graph.get_edge(node, successor)
-            if edge:
-                condition = edge.attr['label'] == '1'
-                new_path = path + [(successor, condition)]
-                self.extract_paths(graph, successor, new_path, paths)
-
-    def _to_path(self, list_rep):
-        curr = self.curr_id
-        if isinstance(list_rep, list) and len(list_rep) == 3:
-            rep = list_rep[0]
-            dot = "\"%s%d\" [ label=\"%s\" ];\n" % (rep, curr, rep)
-            self.curr_id += 1
-
-            for slot in range(1, 3):
-                child = list_rep[slot]
-                if child is None:
-                    continue
-                crep = child[0] if isinstance(child, list) else to_pysmt(child)
-                crep = str(crep).replace('"', '\\\"')
-                dot += "\"%s%d\" -> \"%s%d\" [ label=\"%d\" ];\n" \
-                        %(rep, curr, crep, self.curr_id, slot%2)
-                dot += self._to_path(child)
-            return dot
-        elif list_rep is not None:
-            list_rep = to_pysmt(list_rep)
-            list_rep = str(list_rep).replace('"', '\\\"')
-            temp = "\"%s%d\" [ label=\"%s\" ];\n" % (list_rep, curr, list_rep)
-            self.curr_id += 1
-            return temp
+                adjusted_condition = condition.strip(" ()!")
+            
+            return f"({adjusted_condition})"
+
+        modified_list = []
+        for i in range(0, len(result)-1):
+            condition = result[i][0]
+            flag = result[i+1][1]
+            modified_list.append(adjust(condition, flag))
+    
+        
+        if "=" in result[-1][0] and "^" not in result[-1][0]:
+            condition = result[-1][0]
+            flag = 'False' if condition.count("!") % 2 == 0 else 'True'
+            modified_list.append(adjust(condition, flag))
         else:
-            return ""
-
-
-
-
-
+            modified_list.append(result[-1][0])
 
+        return " -> ".join(modified_list)
 
-    def to_summary(self, unknown=Symbol('Unknown', INT)):
+    def to_summary(self, unknown=None):
+        if unknown is None:
+            unknown = Symbol('Unknown', INT)
         if self.list_rep is None:
             self.list_rep = self._to_list_rep(self.path.root_constraint)
         summary = self._to_summary(self.list_rep, unknown)
@@ -2,12 +2,26 @@
 
 import logging
 import inspect
+import contextvars
 
 from pysmt.shortcuts import *
 
 # the ABSTRACT base class for representing any expression that depends on a symbolic input
 # it also tracks the corresponding concrete value for the expression (aka concolic execution)
 
+class EngineContext:
+    """What the symbolic objects of an execution are linked to: the
+       PathConstraint their branches are recorded in, and the solver and
+       the snapshot of its model their concrete values come from."""
+    def __init__(self, si, solver, model=None):
+        self.si = si
+        self.solver = solver
+        self.model = model
+
+# This is set up by the concolic engine for the duration of an execution, so the
+# objects of one engine are never linked to another engine of the process.
+ENGINE = contextvars.ContextVar("pyexsmt_engine", default=None)
+
 class SymbolicObject(object):
     def __init__(self, expr, name="se", ty=INT):
         if expr is None:
@@ -15,11 +29,6 @@ class SymbolicObject(object):
         else:
             self.expr = expr
 
-    # This is set up by the concolic engine to link __bool__ to PathConstraint
-    SI = None
-    # This is set up by the concolic engine to link the solver to the variables
-    SOLVER = None
-
     # this is a critical interception point: the __bool__
     # method is called whenever a predicate is evaluated in
     # Python execution (if, while, and, or). This allows us
@@ -35,17 +44,21 @@ class SymbolicObject(object):
 
         ret = obj.get_concr_value()
 
-        if SymbolicObject.SI != None:
-            SymbolicObject.SI.which_branch(ret, obj)
+        engine = ENGINE.get()
+        if engine.si is not None:
+            engine.si.which_branch(ret, obj)
 
         return ret
 
     def get_concr_value(self):
-        if SymbolicObject.SOLVER is None:
+        engine = ENGINE.get()
+        if engine is None or engine.solver is None:
             raise ValueError("MUST SPECIFY SOLVER")
-        if not SymbolicObject.SOLVER.last_result:
+        if not engine.solver.last_result:
             raise ValueError("SOLVER MUST HAVE A MODEL")
-        val = SymbolicObject.SOLVER.get_py_value(self.expr)
+        if engine.model is not None:
+            return engine.model.get_py_value(self.expr)
+        val = engine.solver.get_py_value(self.expr)
         return val
 
     def symbolic_eq(self, other):
@@ -55,10 +68,16 @@ class SymbolicObject(object):
         logging.debug("Checking equality of %s and %s: result is %s", repr(self), repr(other), ret)
         return ret
 
+    # outside of an execution there is no concrete value, so a value left in
+    # a result or a log call is hashed and shown by its expression instead
     def __hash__(self):
+        if ENGINE.get() is None:
+            return hash(self.expr)
         return hash(self.get_concr_value())
 
     def __str__(self):
+        if ENGINE.get() is None:
+            return repr(self)
         return str(self.get_concr_value())
 
     def __repr__(self):
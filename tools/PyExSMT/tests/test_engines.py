@@ -0,0 +1,128 @@
+import os
+import sys
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+PYEXSMT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PYEXSMT_DIR)
+
+from pyexsmt.loader import loaderFactory
+from pyexsmt.explore import ExplorationEngine
+from pysmt.environment import Environment, push_env, pop_env
+
+spec = importlib.util.spec_from_file_location("pyexsmt_main", os.path.join(PYEXSMT_DIR, "main.py"))
+pyexsmt_main = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pyexsmt_main)
+
+# two files with the same module name, as translated functions of different classes are
+SOURCES = {
+    "a": "def prog(x, y):\n    if x > 3:\n        if y == x:\n            return 1\n        return 2\n    return 3\n",
+    "b": "def prog(s):\n    if s == 'fit':\n        return 'yes'\n    return 'no'\n",
+}
+
+
+def write_sources(tmp_path):
+    files = {}
+    for name, source in SOURCES.items():
+        os.makedirs(tmp_path / name)
+        files[name] = str(tmp_path / name / "prog.py")
+        with open(files[name], 'w') as f:
+            f.write(source)
+    return files
+
+
+class Exploration:
+    """An engine that is only ever used in a pySMT environment of its own."""
+    def __init__(self, file):
+        self.env = Environment()
+        self.env.enable_infix_notation = True
+        with self:
+            self.app = loaderFactory(file, "prog")
+            self.engine = ExplorationEngine(self.app.create_invocation())
+
+    def __enter__(self):
+        push_env(self.env)
+
+    def __exit__(self, *exc):
+        pop_env()
+
+
+def test_engines_side_by_side(tmp_path, capsys):
+    files = write_sources(tmp_path)
+    expected = {}
+    for name, file in files.items():
+        assert pyexsmt_main.run(file, "prog", path=True) == 0
+        expected[name] = capsys.readouterr().out
+
+    # both engines exist before either explores, and their paths are printed after both explored
+    explorations = {name: Exploration(file) for name, file in files.items()}
+    results = {}
+    for name, exploration in explorations.items():
+        with exploration:
+            results[name] = exploration.engine.explore()
+    for name, exploration in explorations.items():
+        with exploration:
+            results[name].to_path(files[name], exploration.app.literals)
+        assert capsys.readouterr().out == expected[name]
+        assert exploration.app.app.__name__ == "prog"
+        assert "prog" not in sys.modules
+
+
+def test_run_leaves_environment_of_caller(tmp_path, capsys):
+    files = write_sources(tmp_path)
+    env = Environment()
+    push_env(env)
+    try:
+        assert pyexsmt_main.run(files["a"], "prog", path=True) == 0
+        first = capsys.readouterr().out
+        assert pyexsmt_main.run(files["a"], "prog", path=True) == 0
+        assert capsys.readouterr().out == first
+        from pysmt.shortcuts import get_env
+        assert get_env() is env
+    finally:
+        pop_env()
+
+
+def test_runs_on_threads(tmp_path):
+    files = write_sources(tmp_path)
+    expected = {}
+    for name, file in files.items():
+        assert pyexsmt_main.run(file, "prog", tree=str(tmp_path / f"{name}.json")) == 0
+        with open(tmp_path / f"{name}.json") as f:
+            expected[name] = f.read()
+
+    def explore(job):
+        name, k = job
+        tree = str(tmp_path / f"{name}-{k}.json")
+        assert pyexsmt_main.run(files[name], "prog", tree=tree) == 0
+        with open(tree) as f:
+            return name, f.read()
+
+    jobs = [(name, k) for k in range(4) for name in files]
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        for name, tree in executor.map(explore, jobs):
+            assert tree == expected[name]
+
+
+def test_symbolic_values_after_run(tmp_path):
+    # the explored function hands its symbolic values to a module of the test
+    with open(tmp_path / "kept.py", 'w') as f:
+        f.write("VALUES = []\n")
+    with open(tmp_path / "keep.py", 'w') as f:
+        f.write("from kept import VALUES\n\ndef keep(x):\n    VALUES.append(x + 1)\n    if x > 2:\n        return x\n    return 0\n")
+    assert pyexsmt_main.run(str(tmp_path / "keep.py"), "keep") == 0
+    values = sys.modules.pop("kept").VALUES
+    assert values
+    for value in values:
+        assert str(value) == "(x + 1)"
+        assert hash(value) == hash(value.expr)
+
+
+def test_paths_quote_apostrophes(tmp_path, capsys):
+    with open(tmp_path / "prog.py", 'w') as f:
+        f.write("def prog(s):\n    if s == \"it's\":\n        return \"don't\"\n    return 'a\\\\b'\n")
+    assert pyexsmt_main.run(str(tmp_path / "prog.py"), "prog", path=True) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "(s = 'it\\'s') -> 'don\\'t'",
+        "(s != 'it\\'s') -> 'a\\\\b'",
+    ]
@@ -1,8 +1,11 @@
 import os
 import re
 import logging
+import contextlib
+import tools.parser
 
 from z3 import *
+from tools.simCalculator import normalized_levenshtein_distance
 from tools.macros import FUZZWORDS
 from tools.macros import UNSOLVED_WORDS
 from colorlog import ColoredFormatter
@@ -54,6 +57,20 @@ def extract_constraint_expr(path):
     return constraints
 
 
+def constraint_params(folder):
+    """Return the parameter names used by the constraints of the class or function in folder."""
+    names = set()
+    for constraint in extract_constraint_expr(f"{folder}/{os.path.basename(folder)}_constraints.txt"):
+        try:
+            names.update(tools.parser.cons2z3(constraint)[0])
+        except Exception:
+            continue
+    return names
+
+def resembles(name, param):
+    # mutated constraints may misspell a parameter, as the solver's similarity matching allows
+    return name in param or param in name or normalized_levenshtein_distance(name, param) >= 0.75
+
 def solve_expr(z3_expr):
     s = Solver()
     if z3_expr is not None:
@@ -72,6 +89,164 @@ def solve_unsat_expr(z3_expr):
         else:
             return False
 
+# give z3 the String terms of constraints and paths as integers, set from the command line
+ENCODE_STRINGS = False
+
+# how a term uses strings, as StringEncoder sees it
+NO_STRINGS = 0
+COMPARED_STRINGS = 1
+OTHER_STRINGS = 2
+
+
+class StringEncoder:
+    """
+    Rewrites expressions so that z3 decides them without its string theory.
+    Tetrads only ever compare a String variable to a literal with = or !=,
+    so every String variable becomes an Int of the same name and every
+    literal a number of its own: distinct literals stay distinct, which
+    keeps each query exactly as satisfiable as it was. Expressions that use
+    strings in any other way are not encoded.
+    """
+    def __init__(self):
+        self.literals = {}
+        # the encoding of each expression seen, by AST id, with the expression kept alive so the ids below it are not reused
+        self.encoded = {}
+        # how each term below those expressions uses strings, by AST id
+        self.uses = {}
+        # the encoding of each of those terms that compares strings
+        self.rebuilt = {}
+
+    def encode(self, expr):
+        """Return expr with its strings encoded, or None when they cannot be."""
+        if not isinstance(expr, ExprRef):
+            return None
+        key = expr.get_id()
+        if key not in self.encoded:
+            uses = self._uses(expr.ctx_ref(), expr.as_ast())
+            encoding = None
+            if uses == NO_STRINGS:
+                encoding = expr
+            elif uses == COMPARED_STRINGS:
+                encoding = BoolRef(self._encode(expr.ctx, expr.as_ast()), expr.ctx) if is_bool(expr) else None
+            self.encoded[key] = (expr, encoding)
+        return self.encoded[key][1]
+
+    def _uses(self, ctx, ast):
+        # walks the raw AST, since wrapping every term in z3py costs more than z3 takes to decide the query
+        key = Z3_get_ast_id(ctx, ast)
+        if key in self.uses:
+            return self.uses[key]
+        kind = Z3_get_ast_kind(ctx, ast)
+        if kind == Z3_NUMERAL_AST:
+            uses = NO_STRINGS
+        elif kind != Z3_APP_AST:
+            uses = OTHER_STRINGS
+        elif Z3_is_string_sort(ctx, Z3_get_sort(ctx, ast)):
+            # a string anywhere but right below = or !=
+            uses = OTHER_STRINGS
+        else:
+            args = [Z3_get_app_arg(ctx, ast, i) for i in range(Z3_get_app_num_args(ctx, ast))]
+            kind = Z3_get_decl_kind(ctx, Z3_get_app_decl(ctx, ast))
+            if kind in (Z3_OP_EQ, Z3_OP_DISTINCT) and any(Z3_is_string_sort(ctx, Z3_get_sort(ctx, arg)) for arg in args):
+                uses = COMPARED_STRINGS if all(self._is_atom(ctx, arg) for arg in args) else OTHER_STRINGS
+            else:
+                uses = max((self._uses(ctx, arg) for arg in args), default=NO_STRINGS)
+        self.uses[key] = uses
+        return uses
+
+    def _is_atom(self, ctx, ast):
+        if Z3_is_string(ctx, ast):
+            return True
+        return Z3_get_app_num_args(ctx, ast) == 0 and \
+            Z3_get_decl_kind(ctx, Z3_get_app_decl(ctx, ast)) == Z3_OP_UNINTERPRETED
+
+    def _encode(self, ctx, ast):
+        key = Z3_get_ast_id(ctx.ref(), ast)
+        if self.uses[key] == NO_STRINGS:
+            return ast
+        if key not in self.rebuilt:
+            args = [Z3_get_app_arg(ctx.ref(), ast, i) for i in range(Z3_get_app_num_args(ctx.ref(), ast))]
+            decl = Z3_get_app_decl(ctx.ref(), ast)
+            kind = Z3_get_decl_kind(ctx.ref(), decl)
+            if kind in (Z3_OP_EQ, Z3_OP_DISTINCT) and any(Z3_is_string_sort(ctx.ref(), Z3_get_sort(ctx.ref(), arg)) for arg in args):
+                args = (Ast * len(args))(*[self._term(ctx, arg) for arg in args])
+                if kind == Z3_OP_EQ:
+                    encoding = Z3_mk_eq(ctx.ref(), args[0], args[1])
+                else:
+                    encoding = Z3_mk_distinct(ctx.ref(), len(args), args)
+            else:
+                args = (Ast * len(args))(*[self._encode(ctx, arg) for arg in args])
+                encoding = Z3_mk_app(ctx.ref(), decl, len(args), args)
+            # the reference keeps the term alive for as long as the encoder
+            self.rebuilt[key] = ExprRef(encoding, ctx)
+        return self.rebuilt[key].as_ast()
+
+    def _term(self, ctx, ast):
+        term = ExprRef(ast, ctx)
+        if Z3_is_string(ctx.ref(), ast):
+            # z3 shares the term of equal strings, so its id stands for the value
+            encoding = IntVal(self.literals.setdefault(term.get_id(), len(self.literals)), ctx)
+        else:
+            encoding = Int(term.decl().name(), ctx)
+        self.rebuilt[term.get_id()] = encoding
+        return encoding.as_ast()
+
+
+# the encoder of the strings_encoded block being run, which keeps every expression it saw alive
+STRINGS = None
+
+
+@contextlib.contextmanager
+def strings_encoded():
+    """Encode strings with an encoder of their own within the block, and let go of it after."""
+    global STRINGS
+    STRINGS = StringEncoder()
+    try:
+        yield
+    finally:
+        STRINGS = None
+
+
+def encode_strings(expr):
+    """Return expr as STRINGS encodes it, or None when it cannot be, ENCODE_STRINGS is off or no strings_encoded block runs."""
+    return STRINGS.encode(expr) if ENCODE_STRINGS and STRINGS is not None else None
+
+
+class SolverSession:
+    """
+    A z3 solver with the expression of one constraint asserted once, so
+    that checking it against the paths of a function one after the other
+    keeps what z3 learned about the constraint. The constraint and the
+    paths are given to z3 as encode_strings gives them when it can.
+    """
+    def __init__(self, cons_expr):
+        self.cons_expr = cons_expr
+        self.plain = None
+        self.solver = None
+        if cons_expr is not None:
+            encoded = encode_strings(cons_expr)
+            if encoded is not None:
+                self.solver = Solver()
+                self.solver.add(encoded)
+
+    def solve(self, z3_expr):
+        """Return whether the constraint and z3_expr are satisfiable together."""
+        if self.cons_expr is None:
+            raise Z3Exception("The constraint has no expression to solve")
+        solver = self.solver
+        query = encode_strings(z3_expr) if solver is not None else None
+        if query is None:
+            if self.plain is None:
+                self.plain = Solver()
+                self.plain.add(self.cons_expr)
+            solver, query = self.plain, z3_expr
+        solver.push()
+        try:
+            solver.add(query)
+            return solver.check() == sat
+        finally:
+            solver.pop()
+
 def is_contain_fuzzwords(text):
     words = FUZZWORDS["nonexistence"] + FUZZWORDS["existence"]
     text_lower = text.lower()
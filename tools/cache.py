@@ -0,0 +1,120 @@
+import os
+import time
+import hashlib
+import tempfile
+
+from tools.macros import TOOLS_DIR, CACHE_DIR, CACHE_MAX_BYTES, CACHE_MAX_AGE, STAGE_VERSION
+
+# Source files whose content is part of every key of a stage, so that editing
+# the code of a stage invalidates its entries without bumping STAGE_VERSION.
+STAGE_SOURCES = {
+    "parse": ["finder.py"],
+    "translate": ["translator.py", "modifier"],
+    "symex": ["symexecutor.py", "PyExSMT"],
+}
+
+ENABLED = True
+
+_code_digests = {}
+
+
+def read_text(path):
+    if not path or not os.path.exists(path):
+        return ""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+
+def code_digest(stage):
+    if stage not in _code_digests:
+        h = hashlib.sha256()
+        for name in STAGE_SOURCES[stage]:
+            path = os.path.join(TOOLS_DIR, name)
+            if os.path.isfile(path):
+                sources = [path]
+            else:
+                sources = []
+                for root, dirs, files in os.walk(path):
+                    dirs.sort()
+                    sources.extend(os.path.join(root, f) for f in sorted(files) if f.endswith(".py"))
+            for source in sources:
+                h.update(read_text(source).encode())
+        _code_digests[stage] = h.hexdigest()
+    return _code_digests[stage]
+
+
+def make_key(stage, *parts):
+    h = hashlib.sha256()
+    h.update(f"{stage}:{STAGE_VERSION[stage]}:{code_digest(stage)}".encode())
+    for part in parts:
+        data = str(part).encode()
+        h.update(len(data).to_bytes(8, 'big'))
+        h.update(data)
+    return h.hexdigest()
+
+
+def entry_path(stage, key):
+    return os.path.join(CACHE_DIR, stage, key[:2], key)
+
+
+def load(stage, key):
+    """
+    Return the cached artifact of a stage, or None on a miss.
+    """
+    if not ENABLED:
+        return None
+    path = entry_path(stage, key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except OSError:
+        return None
+    os.utime(path)
+    return content
+
+
+def store(stage, key, content):
+    if not ENABLED:
+        return
+    path = entry_path(stage, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write to a private file first so that concurrent runs never read a partial entry
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def evict(max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE):
+    """
+    Drop entries that have not been used for max_age seconds, then the least
+    recently used ones until the cache is no larger than max_bytes.
+    """
+    if not os.path.exists(CACHE_DIR):
+        return
+    now = time.time()
+    entries = []
+    for root, dirs, files in os.walk(CACHE_DIR):
+        for file in files:
+            path = os.path.join(root, file)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > max_age:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
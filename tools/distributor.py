@@ -5,23 +5,33 @@ import shutil
 from tools.macros import INFO_DIR, RES_DIR, PROJECT_DIR
 
 
-def distribute_files(project):
+def distribute_files(project, info_dir=INFO_DIR):
     files = os.listdir(f"{RES_DIR}/{project}")
     for file in files:
         print(f"Putting ----- {file}")
         folder = file[:-4]
-        if os.path.exists(f"{INFO_DIR}/{project}/{folder}"):
-            shutil.copyfile(f"{RES_DIR}/{project}/{file}", f"{INFO_DIR}/{project}/{folder}/{folder}_constraints.txt")
+        if os.path.exists(f"{info_dir}/{project}/{folder}"):
+            shutil.copyfile(f"{RES_DIR}/{project}/{file}", f"{info_dir}/{project}/{folder}/{folder}_constraints.txt")
 
 
-def read_from_benchmark(project):
+def read_from_benchmark(project, info_dir=INFO_DIR, variants=None):
+    """
+    Write the constraint of project into its constraint file, or the
+    constraints of all cases in variants, one per line.
+    """
+    if variants is None:
+        variants = [project]
     with open(f"{PROJECT_DIR}/benchmark.json", "r") as f:
         data = json.load(f)
+    constraints = []
     for item in data:
         if item["id"] == project:
-            constraints = item["constraints"]
             clas = item["class"]
             func = item["func"]
+    for variant in variants:
+        for item in data:
+            if item["id"] == variant:
+                constraints.append(item["constraints"])
 
     if clas == "NA":
         funcname = func
@@ -29,5 +39,5 @@ def read_from_benchmark(project):
         funcname = clas
     if funcname == "roc_auc_score":
         funcname = "_multiclass_roc_auc_score"
-    with open(f"{INFO_DIR}/{project}/{funcname}/{funcname}_constraints.txt", "w") as f:
-        f.write("Logical format:" + constraints)
\ No newline at end of file
+    with open(f"{info_dir}/{project}/{funcname}/{funcname}_constraints.txt", "w") as f:
+        f.write("\n".join("Logical format:" + constraint for constraint in constraints))
\ No newline at end of file
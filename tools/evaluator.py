@@ -0,0 +1,350 @@
+import re
+import numpy as np
+from fractions import Fraction
+from z3 import Solver, Or, sat, unsat, is_true
+
+import tools.parser
+from tools.auxiliary import encode_strings
+
+# answers of GroundEvaluator.evaluate
+SAT = 1
+UNSAT = 0
+UNKNOWN = -1
+
+CONJUNCTION = re.compile(r"\{\d*\}(\^\{\d+\})*")
+# models PathSummary looks at before it leaves the paths still open to z3 one by one
+SUMMARY_MODELS = 8
+
+
+class GroundEvaluator:
+    """
+    The paths of a function as a matrix over interned variables and values,
+    for the paths that are a conjunction of `var = value` and `var != value`
+    facts. A constraint is evaluated against all such paths at once, and
+    only the other paths are left to z3.
+
+    A variable is interned together with the z3 sort tetrad2z3expr gives it,
+    since String(x) and Real(x) are different constants to z3.
+    """
+    def __init__(self, paths):
+        self.keys = {}
+        self.values = {}
+        self.pairs = {}
+        n = len(paths)
+        self.ground = np.zeros(n, dtype=bool)
+        # a ground path whose facts contradict each other
+        self.contradictory = np.zeros(n, dtype=bool)
+
+        rows = []
+        for row, parsed in enumerate(paths):
+            facts = path_facts(parsed)
+            rows.append(facts)
+            if facts is None:
+                continue
+            self.ground[row] = True
+            for key, positive, value in facts:
+                self.keys.setdefault(key, len(self.keys))
+                self.values.setdefault(value, len(self.values))
+                if not positive:
+                    self.pairs.setdefault((key, value), len(self.pairs))
+
+        # the value id a path fixes a variable to, and the values it excludes
+        self.eq = np.full((n, len(self.keys)), UNKNOWN, dtype=np.int64)
+        self.ne = np.zeros((n, len(self.pairs)), dtype=bool)
+        for row, facts in enumerate(rows):
+            if facts is None:
+                continue
+            for key, positive, value in facts:
+                col, vid = self.keys[key], self.values[value]
+                if positive:
+                    if self.eq[row, col] not in (UNKNOWN, vid):
+                        self.contradictory[row] = True
+                    self.eq[row, col] = vid
+            for key, positive, value in facts:
+                if not positive:
+                    self.ne[row, self.pairs[(key, value)]] = True
+                    if self.eq[row, self.keys[key]] == self.values[value]:
+                        self.contradictory[row] = True
+
+    def evaluate(self, logic_expr, params):
+        """
+        Return for every path whether the constraint of cons2z3 given by
+        logic_expr and params is satisfiable together with it: SAT, UNSAT,
+        or UNKNOWN when the path or the constraint needs z3.
+        """
+        n = len(self.ground)
+        unknown = np.full(n, UNKNOWN, dtype=np.int64)
+        if not n or logic_expr is None:
+            return unknown
+        try:
+            # (surely true, surely false) for every path, as in Kleene's logic
+            if logic_expr == "{}":
+                # what cons2z3 gives for a single parameter
+                holds, fails = self._literal(params[0])
+            else:
+                folded = tools.parser.fold_logic(logic_expr, lambda idx: self._literal(params[idx]), _combine, _negate)
+                if folded is None:
+                    return unknown
+                holds, fails = folded
+        except (_NotGround, IndexError, ValueError):
+            return unknown
+
+        answers = np.where(holds, SAT, np.where(fails, UNSAT, UNKNOWN))
+        answers = np.where(self.contradictory, UNSAT, answers)
+        return np.where(self.ground, answers, UNKNOWN)
+
+    def _literal(self, tetrad):
+        n = len(self.ground)
+        literal = tetrad_literal(tetrad)
+        if literal is True:
+            return np.ones(n, dtype=bool), np.zeros(n, dtype=bool)
+        if literal is None or literal[0] not in self.keys:
+            return np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+        key, positive, value = literal
+        column = self.eq[:, self.keys[key]]
+        hit = column == self.values.get(value, -2)
+        excluded = self.ne[:, self.pairs[(key, value)]] if (key, value) in self.pairs else np.zeros(n, dtype=bool)
+        miss = ((column != UNKNOWN) & ~hit) | excluded
+        return (hit, miss) if positive else (miss, hit)
+
+
+class PathTree:
+    """
+    The tree PyExSMT writes next to a path file, in which paths share the
+    conditions of their common prefix. A constraint is checked once against
+    the conditions of a subtree, and when it cannot hold together with them,
+    none of the paths below is left to z3.
+
+    A subtree is only pruned when each of its paths is a conjunction with
+    the tetrads of every condition above it, so that the path implies what
+    the constraint was refuted with. The conditions and the constraint go
+    to z3 as encode_strings gives them, unless one of them cannot be encoded.
+    """
+    def __init__(self, tree, paths, clean=str.strip):
+        rows = {}
+        for row, parsed in enumerate(paths):
+            rows.setdefault(parsed.text, []).append(row)
+        self.size = len(paths)
+        # conditions recur across branches, so each is parsed once
+        self.conditions = {}
+        self.encodable = True
+        self.root = self._build(tree, None, [], set(), paths, rows, clean)
+
+    def _build(self, tree, expr, segments, prefix, paths, rows, clean):
+        node = _TreeNode(expr)
+        if expr is not None:
+            node.encoded = encode_strings(expr)
+            self.encodable = self.encodable and node.encoded is not None
+        found = []
+        if tree.get("lines"):
+            for row in rows.get(clean(" -> ".join(segments)), []):
+                found.append(row)
+                parsed = paths[row]
+                tetrads = None
+                if parsed.error is None and parsed.expr is not None:
+                    tetrads = conjuncts(parsed.logic, parsed.params)
+                if tetrads is None or not prefix <= set(tetrads):
+                    node.prunable = False
+        for segment, subtree in tree.get("children", {}).items():
+            condition = None
+            # the effect a path ends in would only ever rule out that path itself
+            if subtree.get("children"):
+                if segment not in self.conditions:
+                    self.conditions[segment] = segment_condition(segment)
+                condition = self.conditions[segment]
+            tetrads = prefix
+            if condition is not None:
+                tetrads = prefix | set(condition[0])
+            expr = condition[1] if condition is not None else None
+            child = self._build(subtree, expr, segments + [segment], tetrads, paths, rows, clean)
+            node.children.append(child)
+            node.prunable = node.prunable and child.prunable
+            found.extend(child.rows)
+        node.rows = np.array(found, dtype=np.int64)
+        # where a chain of conditions ends, since pruning it any higher saves no more paths
+        node.check = node.prunable and len(node.rows) > 1 and (len(node.children) != 1 or "lines" in tree)
+        node.worth = node.check or any(child.worth for child in node.children)
+        return node
+
+    def evaluate(self, cons_expr, answers=None):
+        """
+        Return answers, as given by GroundEvaluator.evaluate, with the paths
+        of the subtrees the constraint cons_expr cannot hold in set to UNSAT.
+        """
+        answers = np.full(self.size, UNKNOWN, dtype=np.int64) if answers is None else answers.copy()
+        if cons_expr is None or not self.root.worth:
+            return answers
+        encoded = encode_strings(cons_expr) if self.encodable else None
+        solver = Solver()
+        solver.add(cons_expr if encoded is None else encoded)
+        self._prune(self.root, solver, answers, encoded is not None)
+        return answers
+
+    def _prune(self, node, solver, answers, encoded):
+        for child in node.children:
+            if not child.worth or (answers[child.rows] != UNKNOWN).all():
+                continue
+            solver.push()
+            if child.expr is not None:
+                solver.add(child.encoded if encoded else child.expr)
+            if child.check and solver.check() == unsat:
+                answers[child.rows] = UNSAT
+            else:
+                self._prune(child, solver, answers, encoded)
+            solver.pop()
+
+
+class PathSummary:
+    """
+    The paths of a function as one formula, the disjunction of their z3
+    expressions, so that a constraint is decided against all of them with
+    a single query: when it cannot hold together with the disjunction, it
+    cannot hold on any of the paths.
+
+    When it can, the model z3 gives satisfies some of the paths, which are
+    taken out of the disjunction before asking again, for at most
+    SUMMARY_MODELS models. As in PathTree, z3 is given the expressions as
+    encode_strings gives them when it can for all of them.
+    """
+    def __init__(self, paths):
+        self.exprs = [parsed.expr if parsed.error is None else None for parsed in paths]
+        self.encoded = [encode_strings(expr) if expr is not None else None for expr in self.exprs]
+
+    def evaluate(self, cons_expr, answers=None):
+        """
+        Return answers, as given by GroundEvaluator.evaluate, with the paths
+        that were still UNKNOWN decided where the summary tells.
+        """
+        answers = np.full(len(self.exprs), UNKNOWN, dtype=np.int64) if answers is None else answers.copy()
+        if cons_expr is None:
+            return answers
+        pending = [row for row, expr in enumerate(self.exprs) if expr is not None and answers[row] == UNKNOWN]
+        exprs = self.exprs
+        encoded = encode_strings(cons_expr)
+        if encoded is not None and all(self.encoded[row] is not None for row in pending):
+            exprs, cons_expr = self.encoded, encoded
+        solver = Solver()
+        solver.add(cons_expr)
+        for _ in range(SUMMARY_MODELS):
+            if not pending:
+                break
+            result = solver.check(Or([exprs[row] for row in pending]))
+            if result == unsat:
+                answers[pending] = UNSAT
+                break
+            if result != sat:
+                break
+            model = solver.model()
+            hit = {row for row in pending if is_true(model.eval(exprs[row], model_completion=True))}
+            if not hit:
+                break
+            answers[sorted(hit)] = SAT
+            pending = [row for row in pending if row not in hit]
+        return answers
+
+
+class _TreeNode:
+    def __init__(self, expr):
+        self.expr = expr
+        self.encoded = None
+        self.children = []
+        self.rows = None
+        self.prunable = True
+        self.check = False
+        self.worth = False
+
+
+def segment_condition(segment):
+    """
+    Return the tetrads and z3 expression of a condition of a path as cons2z3
+    reads it, or None when it is not a conjunction of tetrads, such as the
+    error a path ends in.
+    """
+    if "_END" in segment:
+        return None
+    try:
+        pnames, params, expr, logic = tools.parser.cons2z3(segment.replace(" ", "").strip('"'))
+    except Exception:
+        return None
+    tetrads = conjuncts(logic, params) if expr is not None else None
+    if tetrads is None:
+        return None
+    return tetrads, expr
+
+
+class _NotGround(Exception):
+    pass
+
+
+def _combine(a, b, op):
+    if a is None or b is None:
+        raise _NotGround()
+    if op == "^":
+        return a[0] & b[0], a[1] | b[1]
+    elif op == "|":
+        return a[0] | b[0], a[1] & b[1]
+    raise _NotGround()
+
+
+def _negate(a):
+    if a is None:
+        raise _NotGround()
+    return a[1], a[0]
+
+
+def tetrad_literal(tetrad):
+    """
+    Return the tetrad as (key, positive, value), meaning key = value when
+    positive and key != value otherwise, True when tetrad2z3expr makes it
+    true, or None when it is not such a fact.
+    """
+    var, op, str_val, nonstr_val = tetrad
+    if var.startswith("call_") or var.startswith("list_") or var.startswith("dict_"):
+        return True
+    if op not in ("=", "!="):
+        return None
+    positive = op == "="
+    if str_val:
+        if str_val == 'True' or str_val == 'False':
+            # x = 'True' is Real(x) != 0 and x = 'False' is Real(x) == 0
+            return ("Real", var), positive == (str_val == 'False'), Fraction(0)
+        if "\\" in str_val:
+            # z3 reads escape sequences in string literals
+            return None
+        return ("String", var), positive, str_val
+    if nonstr_val and tools.parser.is_number(nonstr_val):
+        try:
+            return ("Real", var), positive, Fraction(nonstr_val)
+        except ValueError:
+            return None
+    return None
+
+
+def conjuncts(logic, params):
+    """Return the tetrads of a constraint of cons2z3 that is a conjunction of them, or None."""
+    if not logic or not CONJUNCTION.fullmatch(logic):
+        return None
+    if logic == "{}":
+        indices = [0]
+    else:
+        indices = [int(idx) for idx in re.findall(r"\{(\d+)\}", logic)]
+    if any(idx >= len(params) for idx in indices):
+        return None
+    return [params[idx] for idx in indices]
+
+
+def path_facts(parsed):
+    """Return the facts of a parsed path that is a conjunction of them, or None."""
+    if parsed.error is not None or parsed.expr is None:
+        return None
+    tetrads = conjuncts(parsed.logic, parsed.params)
+    if tetrads is None:
+        return None
+    facts = []
+    for tetrad in tetrads:
+        literal = tetrad_literal(tetrad)
+        if literal is None:
+            return None
+        if literal is not True:
+            facts.append(literal)
+    return facts
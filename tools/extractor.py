@@ -5,12 +5,12 @@ from tools.macros import _DOWNLOAD_DIR
 from tools.macros import INFO_DIR
 from tools.macros import FLAG
 
-def extract_class_and_independent_function(project):
+def extract_class_and_independent_function(project, info_dir=INFO_DIR):
     project_path = os.path.join(_DOWNLOAD_DIR, project)
     if not os.path.exists(project_path):
         print(f"Please download the project first: {project}")
         exit(0)
-    info_path = os.path.join(INFO_DIR, project)
+    info_path = os.path.join(info_dir, project)
     if not os.path.exists(info_path):
         os.makedirs(info_path)
     
@@ -30,7 +30,7 @@ def extract_class_and_independent_function(project):
     }
     
     for file in codefiles:
-        statistics = extract_content(file, project, statistics)
+        statistics = extract_content(file, project, statistics, info_dir)
     
     for root, dirs, files in os.walk(info_path, topdown=False):
         for name in dirs:
@@ -47,7 +47,7 @@ def extract_class_and_independent_function(project):
     print(f"INDEPENDENT FUNCTION WITH DOCSTRING: {statistics['independent_function_with_docstring']}")
     print(f"=============== END ===============")
 
-def extract_content(file, project, statistics):
+def extract_content(file, project, statistics, info_dir=INFO_DIR):
     with open(file, 'r') as f:
         content = f.read()
     f.close()
@@ -71,11 +71,11 @@ def extract_content(file, project, statistics):
             if docstring and flag in docstring:
                 node.decorator_list = []
                 self.classes_with_docstring.append(node.name)
-                if not os.path.exists(f'{INFO_DIR}/{project}/{node.name}'):
-                    os.makedirs(f'{INFO_DIR}/{project}/{node.name}')
-                with open(f'{INFO_DIR}/{project}/{node.name}/{node.name}.py', 'w') as fc:
+                if not os.path.exists(f'{info_dir}/{project}/{node.name}'):
+                    os.makedirs(f'{info_dir}/{project}/{node.name}')
+                with open(f'{info_dir}/{project}/{node.name}/{node.name}.py', 'w') as fc:
                     fc.write(ast.unparse(node))
-                with open(f'{INFO_DIR}/{project}/{node.name}/{node.name}_docstring.txt', 'w') as fd:
+                with open(f'{info_dir}/{project}/{node.name}/{node.name}_docstring.txt', 'w') as fd:
                     fd.write(docstring)
             self.generic_visit(node)
 
@@ -86,24 +86,24 @@ def extract_content(file, project, statistics):
                 if docstring and flag in docstring:
                     node.decorator_list = []
                     self.independent_functions_with_docstring.append(node.name)
-                    if not os.path.exists(f'{INFO_DIR}/{project}/{node.name}'):
-                        os.makedirs(f'{INFO_DIR}/{project}/{node.name}')
-                    with open(f'{INFO_DIR}/{project}/{node.name}/{node.name}.py', 'w') as fc:
+                    if not os.path.exists(f'{info_dir}/{project}/{node.name}'):
+                        os.makedirs(f'{info_dir}/{project}/{node.name}')
+                    with open(f'{info_dir}/{project}/{node.name}/{node.name}.py', 'w') as fc:
                         fc.write(ast.unparse(node))
-                    with open(f'{INFO_DIR}/{project}/{node.name}/{node.name}_docstring.txt', 'w') as fd:
+                    with open(f'{info_dir}/{project}/{node.name}/{node.name}_docstring.txt', 'w') as fd:
                         fd.write(docstring)
             else:
                 if node.name != "__init__":
                     node.decorator_list = []
                     self.inside_functions.append(node.name)
-                    if not os.path.exists(f'{INFO_DIR}/{project}/{node.parent.name}/memberfunc/{node.name}'):
-                        os.makedirs(f'{INFO_DIR}/{project}/{node.parent.name}/memberfunc/{node.name}')
-                    with open(f'{INFO_DIR}/{project}/{node.parent.name}/memberfunc/{node.name}/{node.name}.py', 'w') as fc:
+                    if not os.path.exists(f'{info_dir}/{project}/{node.parent.name}/memberfunc/{node.name}'):
+                        os.makedirs(f'{info_dir}/{project}/{node.parent.name}/memberfunc/{node.name}')
+                    with open(f'{info_dir}/{project}/{node.parent.name}/memberfunc/{node.name}/{node.name}.py', 'w') as fc:
                         fc.write(ast.unparse(node))
                     docstring = ast.get_docstring(node)
                     if docstring and flag in docstring:
                         self.inside_functions_with_docstring.append(node.name)
-                        with open(f'{INFO_DIR}/{project}/{node.parent.name}/memberfunc/{node.name}/{node.name}_docstring.txt', 'w') as fd:
+                        with open(f'{info_dir}/{project}/{node.parent.name}/memberfunc/{node.name}/{node.name}_docstring.txt', 'w') as fd:
                             fd.write(docstring)
             self.generic_visit(node) 
 
@@ -4,8 +4,8 @@ import json
 
 from tools.macros import INFO_DIR
 
-def filter_params_and_attributes(project):
-    info_path = os.path.join(INFO_DIR, project)
+def filter_params_and_attributes(project, info_dir=INFO_DIR):
+    info_path = os.path.join(info_dir, project)
     if not os.path.exists(info_path):
         print(f"Do not have project: {project}, please extract info first")
     folders = os.listdir(info_path)
@@ -15,45 +15,45 @@ def filter_params_and_attributes(project):
         if "DS_Store" in folder:
             continue
         
-        if os.path.exists(f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"):
-            pa_path = f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"
+        if os.path.exists(f"{info_dir}/{project}/{folder}/{folder}_pa.json"):
+            pa_path = f"{info_dir}/{project}/{folder}/{folder}_pa.json"
             pa_graph = generate_graph(pa_path)
             if not has_cross_parameters(pa_graph):
                 os.remove(pa_path)
-        if os.path.exists(f"{INFO_DIR}/{project}/{folder}/memberfunc"):
-            memberfunc_folders = os.listdir(f"{INFO_DIR}/{project}/{folder}/memberfunc")
+        if os.path.exists(f"{info_dir}/{project}/{folder}/memberfunc"):
+            memberfunc_folders = os.listdir(f"{info_dir}/{project}/{folder}/memberfunc")
             for memberfunc in memberfunc_folders:
                 if "DS_Store" in memberfunc:
                     continue
-                if os.path.exists(f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"):
-                    pa_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"
+                if os.path.exists(f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"):
+                    pa_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"
                     pa_graph = generate_graph(pa_path)
                     if not has_cross_parameters(pa_graph):
                         os.remove(pa_path)
 
     for folder in folders:
-        if not os.path.exists(f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"):
+        if not os.path.exists(f"{info_dir}/{project}/{folder}/{folder}_pa.json"):
             sub_pa = False
-            if os.path.exists(f"{INFO_DIR}/{project}/{folder}/memberfunc"):
-                memberfunc_folders = os.listdir(f"{INFO_DIR}/{project}/{folder}/memberfunc")
+            if os.path.exists(f"{info_dir}/{project}/{folder}/memberfunc"):
+                memberfunc_folders = os.listdir(f"{info_dir}/{project}/{folder}/memberfunc")
                 for memberfunc in memberfunc_folders:
                     if "DS_Store" in memberfunc:
                         continue
-                    if os.path.exists(f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"):
+                    if os.path.exists(f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"):
                         sub_pa = True
                     else:
-                        cur_folder = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}"
+                        cur_folder = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}"
                         shutil.rmtree(cur_folder)
             if not sub_pa:
-                cur_folder = f"{INFO_DIR}/{project}/{folder}"
+                cur_folder = f"{info_dir}/{project}/{folder}"
                 shutil.rmtree(cur_folder)
 
     fs = os.listdir(info_path)
     for f in fs:
         if "DS_Store" in folder:
             continue
-        if not os.path.exists(f"{INFO_DIR}/{project}/{f}/{f}_pa.json"):
-            cur_folder = f"{INFO_DIR}/{project}/{f}"
+        if not os.path.exists(f"{info_dir}/{project}/{f}/{f}_pa.json"):
+            cur_folder = f"{info_dir}/{project}/{f}"
             shutil.rmtree(cur_folder)
 
     count_after = count_directories(info_path)
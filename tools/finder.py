@@ -1,43 +1,59 @@
 import os
 import re
 import json
+import tools.cache
 
 from tools.macros import INFO_DIR
 from tools.macros import FLAG
 
 
-def find_params_and_attributes(project):
-    info_path = os.path.join(INFO_DIR, project)
+def find_params_and_attributes(project, info_dir=INFO_DIR):
+    info_path = os.path.join(info_dir, project)
     if not os.path.exists(info_path):
         print(f"{project}'s info files is not exist, please extract info first")
     folders = os.listdir(info_path)
     for folder in folders:
         if "DS_Store" in folder:
             continue
-        find_pa_content(project, folder)
+        find_pa_content(project, folder, info_dir)
 
 
 
-def find_pa_content(project, folder):
+def find_pa_content(project, folder, info_dir=INFO_DIR):
     print(f"Processing ----- {folder}")
-    if os.path.exists(f"{INFO_DIR}/{project}/{folder}/memberfunc"):
-        memberfunc_folders = os.listdir(f"{INFO_DIR}/{project}/{folder}/memberfunc")
+    if os.path.exists(f"{info_dir}/{project}/{folder}/memberfunc"):
+        memberfunc_folders = os.listdir(f"{info_dir}/{project}/{folder}/memberfunc")
         for memberfunc in memberfunc_folders:
             if "DS_Store" in memberfunc:
                 continue
             print(f"Processing memberfunc: {memberfunc}")
-            file_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_docstring.txt"
-            output_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"
+            file_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_docstring.txt"
+            output_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"
             parse_and_save(project, file_path, output_path)
     
-    file_path = f"{INFO_DIR}/{project}/{folder}/{folder}_docstring.txt"
-    output_path = f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"
+    file_path = f"{info_dir}/{project}/{folder}/{folder}_docstring.txt"
+    output_path = f"{info_dir}/{project}/{folder}/{folder}_pa.json"
     parse_and_save(project, file_path, output_path)
 
     
 def parse_and_save(project, file_path, output_path):
     if not os.path.exists(file_path):
         return
+    # save_to_json only depends on the project through its docstring style and the scipy/example key rule
+    key = tools.cache.make_key("parse", FLAG.get(project), project in ("scipy", "example"), tools.cache.read_text(file_path))
+    cached = tools.cache.load("parse", key)
+    if cached is not None:
+        if cached:
+            with open(output_path, 'w') as f:
+                f.write(cached)
+        return
+    if parse_docstring(project, file_path, output_path):
+        tools.cache.store("parse", key, tools.cache.read_text(output_path))
+    else:
+        tools.cache.store("parse", key, "")
+
+
+def parse_docstring(project, file_path, output_path):
     try:
         if FLAG[project] == "Args:": 
             args, attributes = parse_google_style_docstring(file_path)
@@ -45,13 +61,14 @@ def parse_and_save(project, file_path, output_path):
             args, attributes = parse_numpy_style_docstring(file_path)
     except:
         print("Format Wrong")
-        return
+        return False
     try:
         if not args:
-            return 
+            return False
     except:
-        return 
+        return False
     save_to_json(project, args, attributes, output_path)
+    return True
 
 
 
@@ -7,9 +7,23 @@ TOOLS_DIR = os.path.join(PROJECT_DIR, 'tools')
 _DOWNLOAD_DIR = os.path.join(PROJECT_DIR, '_downloads')
 INFO_DIR = os.path.join(PROJECT_DIR, 'info')
 RES_DIR = os.path.join(PROJECT_DIR, 'res')
+LOG_DIR = os.path.join(PROJECT_DIR, 'logs')
+WORKSPACE_DIR = os.path.join(PROJECT_DIR, 'workspaces')
+CACHE_DIR = os.path.join(PROJECT_DIR, '.cache')
 PYEXSMT_DIR = os.path.join(TOOLS_DIR, 'PyExSMT')
 PYEXECUTOR = os.path.join(PYEXSMT_DIR, 'main.py')
 
+# bump the version of a stage whenever its cached artifacts must not be reused
+STAGE_VERSION = {
+    "parse": 1,
+    "translate": 1,
+    "symex": 1,
+}
+# a symbolic execution worker is replaced after this many functions, dropping what they left in memory
+SYMEX_WORKER_JOBS = 200
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+CACHE_MAX_AGE = 30 * 24 * 3600
+
 FUZZWORDS = {
     "nonexistence": ["ignore", "no effect", "unused", "override"],
     'existence': ["specify", "specified", "have an effect", "significant", "exist", "existed", "used"] 
@@ -5,8 +5,8 @@ import json
 from tools.macros import INFO_DIR
 
 
-def match_alignment(project):
-    info_path = os.path.join(INFO_DIR, project)
+def match_alignment(project, info_dir=INFO_DIR):
+    info_path = os.path.join(info_dir, project)
     if not os.path.exists(info_path):
         print(f"Do not have project: {project}, please extract info first")
     folders = os.listdir(info_path)
@@ -14,21 +14,21 @@ def match_alignment(project):
     for folder in folders:
         if "DS_Store" in folder:
             continue
-        check_match(project, folder)
+        check_match(project, folder, info_dir)
 
 
-def check_match(project, folder):
-    if os.path.exists(f"{INFO_DIR}/{project}/{folder}/memberfunc"):
-        memberfunc_folders = os.listdir(f"{INFO_DIR}/{project}/{folder}/memberfunc")
+def check_match(project, folder, info_dir=INFO_DIR):
+    if os.path.exists(f"{info_dir}/{project}/{folder}/memberfunc"):
+        memberfunc_folders = os.listdir(f"{info_dir}/{project}/{folder}/memberfunc")
         for memberfunc in memberfunc_folders:
             if "DS_Store" in memberfunc:
                 continue
-            func_json_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"
-            func_code_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}.py"
+            func_json_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"
+            func_code_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}.py"
             single_match(func_json_path, func_code_path, folder)
     
-    func_json_path = f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"
-    func_code_path = f"{INFO_DIR}/{project}/{folder}/{folder}.py"
+    func_json_path = f"{info_dir}/{project}/{folder}/{folder}_pa.json"
+    func_code_path = f"{info_dir}/{project}/{folder}/{folder}.py"
     single_match(func_json_path, func_code_path, folder)
 
 
@@ -1,6 +1,71 @@
 import re
+import functools
+import itertools
 from z3 import *
 
+# the literals cons2z3 puts in quotes of its own, whatever quotes they came in
+LITERAL = re.compile(r'["\'](None|False|True)["\']|(None|False|True)')
+FUNCTION_CALL = re.compile(r'\b\w+\s*=\s*(?:\w+\.)?\w+\s*\(')
+# a comparison whose value may be a function call, and one whose value may not
+CALL_TETRAD = re.compile(r"(\w+)\s*(=|!=|<=|>=|<|>)\s*('((?:[^'\\]|\\.)*)'|-?\d+(?:\.\d+)?|\w+\([^()]*?(?:\([^()]*?\)[^()]*?)*\)|\w+)")
+TETRAD = re.compile(r"(\w+)\s*(=|!=|<=|>=|<|>)\s*(?:'((?:[^'\\]|\\.)*)'|(-?\d+(?:\.\d+)?|\w+))")
+EMPTY_INDEX = re.compile(r'\{\}')
+# the characters scan_constraint rewrites one at a time, and the runs of all others
+CONSTRAINT_TOKEN = re.compile(r"[^ !()\[\]{}<>&|-]+|.", re.DOTALL)
+# what a logic expression of cons2z3 is made of
+LOGIC = re.compile(r"(?:\{\d+\}|[()\[\]^|])*")
+LOGIC_TOKEN = re.compile(r"\{(\d+)\}|[()\[\]^|]")
+
+class SymbolTable:
+    """
+    The z3 constants of the variables and literals tetrads compare, each
+    made once and handed out again, with how often that happened. A name
+    is a different constant to z3 as a Real than as a String, so the sort
+    is part of the key.
+    """
+    def __init__(self):
+        self.symbols = {}
+        self.hits = 0
+        self.misses = 0
+
+    def real(self, name):
+        return self._get("Real", name, Real)
+
+    def string(self, name):
+        return self._get("String", name, String)
+
+    def real_val(self, value):
+        return self._get("RealVal", value, RealVal)
+
+    def string_val(self, value):
+        return self._get("StringVal", value, StringVal)
+
+    def _get(self, sort, name, make):
+        symbol = self.symbols.get((sort, name))
+        if symbol is None:
+            symbol = self.symbols[(sort, name)] = make(name)
+            self.misses += 1
+        else:
+            self.hits += 1
+        return symbol
+
+    def stats(self):
+        """Return the number of constants made and reused, and of names that are both a Real and a String."""
+        sorts = {}
+        for sort, name in self.symbols:
+            if sort in ("Real", "String"):
+                sorts.setdefault(name, set()).add(sort)
+        return {
+            "symbols": len(self.symbols),
+            "hits": self.hits,
+            "misses": self.misses,
+            "mixed_sorts": sum(len(s) > 1 for s in sorts.values()),
+        }
+
+
+SYMBOLS = SymbolTable()
+
+
 def is_number(s):
     try:
         float(s)
@@ -9,31 +74,32 @@ def is_number(s):
         return False
 
 def contains_function_calls(constraint):
-    pattern = r'\b\w+\s*=\s*(?:\w+\.)?\w+\s*\('
-    matches = re.findall(pattern, constraint)
+    matches = FUNCTION_CALL.findall(constraint)
     if matches:
         return True
     else:
         return False
 
 def cons2z3(constraint):
-    constraint = constraint.strip()
+    """
+    Return the parameter names, tetrads, z3 expression and logic expression
+    of constraint. Constraints and paths recur across the constraints and
+    functions of a run, so the results are cached by the text parsed.
+    """
+    pnames, params, expr, logic = _cons2z3(constraint)
+    return list(pnames), list(params), expr, logic
 
-    def ensure_no_quotes_around_literals(input_str):
-        def remove_quotes(match):
-            return match.group(1)
-        pattern = r'["\'](None|False|True)["\']'
-        return re.sub(pattern, remove_quotes, input_str)
 
-    constraint = ensure_no_quotes_around_literals(constraint).replace("None", "'None'").replace("False", "'False'").replace("True", "'True'")
+@functools.lru_cache(maxsize=4096)
+def _cons2z3(constraint):
+    constraint = LITERAL.sub(lambda match: f"'{match.group(1) or match.group(2)}'", constraint.strip())
 
     if contains_function_calls(constraint):
-        pattern = re.compile(r"(\w+)\s*(=|!=|<=|>=|<|>)\s*('([^']*)'|-?\d+(?:\.\d+)?|\w+\([^()]*?(?:\([^()]*?\)[^()]*?)*\)|\w+)")
+        pattern = CALL_TETRAD
     else:
-        pattern = re.compile(r"(\w+)\s*(=|!=|<=|>=|<|>)\s*(?:'([^']*)'|(-?\d+(?:\.\d+)?|\w+))")
+        pattern = TETRAD
 
-    # pattern = re.compile(r"(\w+)\s*(=|!=|<=|>=|<|>)\s*('([^']*)'|-?\d+(?:\.\d+)?|\w+\([^()]*?(?:\([^()]*?\)[^()]*?)*\)|\w+)")
-    matches = pattern.findall(constraint)
+    matches, logic_expr = scan_constraint(constraint, pattern)
     if "numpy.take" in constraint:
         matches.pop(0)
         matches.pop(0)
@@ -42,49 +108,11 @@ def cons2z3(constraint):
     if len(matches) == 1:
         return [matches[0][0]], matches, tetrad2z3expr(matches[0]), "{}"
 
-    def remove_closest_right_parenthesis(text):
-        text = list(text)
-        idx = 0
-        while idx < len(text):
-            if text[idx] == '[':
-                for j in range(idx + 1, len(text)):
-                    if text[j] == ')':
-                        text[j] = "]"
-                        break
-            idx += 1
-        return ''.join(text)
-    
-    lexpr = remove_closest_right_parenthesis(pattern.sub("{}", constraint).replace(" ","").replace("!(", "[")) 
-    logic_expr_bc = lexpr.replace("({})", "{}").replace("->", "^").replace("||", "|").replace("&&", "^")
-
-    def has_digit_or_alpha(s):
-        for char in s:
-            if char.isdigit() or char.isalpha():
-                return True
-        return False
-
-    exprarr = logic_expr_bc.split('^')
-    new_exprarr = []
-    for i in range(len(exprarr)):
-        exprarr[i] = exprarr[i].strip()
-        if not has_digit_or_alpha(exprarr[i]):
-            new_exprarr.append(exprarr[i])
-
-    logic_expr = "^".join(new_exprarr)
-
-    def add_index(s):
-        idx = 0
-        def replacer(match):
-            nonlocal idx
-            result = f'{{{idx}}}' 
-            idx += 1
-            return result
+    # only the fragments between conjunctions that are made of nothing but logic are kept
+    logic_expr = "^".join(part.strip() for part in logic_expr.split("^") if not any(c.isalpha() or c.isdigit() for c in part))
+    idx = itertools.count()
+    logic_expr = EMPTY_INDEX.sub(lambda match: f"{{{next(idx)}}}", logic_expr)
 
-        return re.sub(r'\{\}', replacer, s)
-
-    logic_expr = add_index(logic_expr)
-    logic_expr = logic_expr.replace("^(call_len-1)!=n_bins_list_13^", "^").replace("^(call_len-1)=n_bins_list_13^", "^").replace("^(subsample=-1)^", "^")
-    
     params = []
     opposite_table = {
         ">": "<",
@@ -106,6 +134,56 @@ def cons2z3(constraint):
 
     return pnames, params, res_expr, logic_expr
 
+def scan_constraint(constraint, pattern):
+    """
+    Read constraint in one pass. Returns the tetrads of pattern in it, and
+    the constraint with every tetrad as {} and its spaces dropped, in which
+    !( is [, a ) is ] if a [ before it has not been closed yet, ({}) is {},
+    -> and && are ^ and || is |. Characters that come out of a replacement
+    are not replaced again.
+    """
+    matches = []
+    out = []
+    # how many [ are waiting for a ), and where the last ({}) and || replaced end
+    open_brackets = 0
+    group_end = pipe_end = 0
+
+    def read(text):
+        nonlocal open_brackets, group_end, pipe_end
+        for c in CONSTRAINT_TOKEN.findall(text):
+            if c == " ":
+                continue
+            if c == "(" and out and out[-1] == "!":
+                out[-1] = "["
+                open_brackets += 1
+            elif c == "[":
+                out.append(c)
+                open_brackets += 1
+            elif c == ")" and open_brackets:
+                out.append("]")
+                open_brackets -= 1
+            elif c == ")" and len(out) - 3 >= group_end and out[-3:] == ["(", "{", "}"]:
+                out[-3:] = "{}"
+                group_end = len(out)
+            elif c == ">" and out and out[-1] == "-":
+                out[-1] = "^"
+            elif c == "&" and out and out[-1] == "&":
+                out[-1] = "^"
+            elif c == "|" and len(out) - 1 >= pipe_end and out and out[-1] == "|":
+                pipe_end = len(out)
+            else:
+                out.append(c)
+
+    pos = 0
+    for match in pattern.finditer(constraint):
+        read(constraint[pos:match.start()])
+        matches.append(match.groups(""))
+        out += "{}"
+        pos = match.end()
+    read(constraint[pos:])
+    return matches, "".join(out)
+
+
 def calc(a, b, op):
     if op == "^":
         return And(a, b)
@@ -114,6 +192,85 @@ def calc(a, b, op):
 
 
 def trans2expr(expr, params):
+    return fold_logic(expr, lambda idx: tetrad2z3expr(params[idx]), calc, Not)
+
+
+def fold_logic(expr, leaf, combine, negate):
+    """
+    Evaluate the logic expression expr of cons2z3, with leaf giving the value
+    of parameter {i}, combine(a, b, op) the value of a ^ b or a | b, and
+    negate the value of [a].
+    """
+    try:
+        group = parse_logic(expr)
+    except ValueError:
+        # scanning reads whatever it can out of anything else
+        return scan_logic(expr, leaf, combine, negate)
+    return _fold_group(group, leaf, combine, negate)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_logic(expr):
+    """
+    Parse a logic expression of cons2z3 in one pass into a group: a tuple of
+    its items and the operators between them. An item is the index of a
+    parameter, ("(", group) or ("[", group) for a negated group.
+    Raises ValueError unless expr is made of nothing but such groups.
+    """
+    if not expr or not LOGIC.fullmatch(expr):
+        raise ValueError(f"Not a logic expression: {expr}")
+    tokens = [(match.group(1), match.group(0)) for match in LOGIC_TOKEN.finditer(expr)]
+    pos = 0
+
+    def parse_group(close):
+        nonlocal pos
+        items, ops = [], []
+        while pos < len(tokens):
+            index, token = tokens[pos]
+            pos += 1
+            if index is not None:
+                items.append(int(index))
+            elif token == "(":
+                items.append(("(", parse_group(")")))
+            elif token == "[":
+                items.append(("[", parse_group("]")))
+            else:
+                break
+            if pos == len(tokens):
+                if close is None:
+                    return tuple(items), tuple(ops)
+                break
+            token = tokens[pos][1]
+            pos += 1
+            if token == close:
+                return tuple(items), tuple(ops)
+            if token not in ("^", "|"):
+                break
+            ops.append(token)
+        raise ValueError(f"Not a logic expression: {expr}")
+
+    return parse_group(None)
+
+
+def _fold_group(group, leaf, combine, negate):
+    items, ops = group
+    values = []
+    for item in items:
+        if isinstance(item, int):
+            values.append(leaf(item))
+        elif item[0] == "[":
+            values.append(negate(_fold_group(item[1], leaf, combine, negate)))
+        else:
+            values.append(_fold_group(item[1], leaf, combine, negate))
+    # the operators of a group apply from the right, as scan_logic applies them
+    value = values.pop()
+    for op in reversed(ops):
+        value = combine(values.pop(), value, op)
+    return value
+
+
+def scan_logic(expr, leaf, combine, negate):
+    """fold_logic for any string, scanning for the matching parenthesis at every level."""
 
     def find_matching_paren(s, left_index):
         if s[left_index] != '(':
@@ -158,13 +315,13 @@ def trans2expr(expr, params):
     while i < n:
         if expr[i] == "(":
             k = find_matching_paren(expr, i)
-            returned = trans2expr(expr[i+1:k], params)
+            returned = scan_logic(expr[i+1:k], leaf, combine, negate)
             exs.append(returned)
             i = k + 1
         elif expr[i] == "[":
             ops.append(expr[i])
             ks = find_matching_square_paren(expr, i)
-            returned = trans2expr(expr[i+1:ks], params)
+            returned = scan_logic(expr[i+1:ks], leaf, combine, negate)
             exs.append(returned)
             i = ks
         elif expr[i] == "^":
@@ -177,14 +334,14 @@ def trans2expr(expr, params):
             for j in range(i, n):
                 if expr[j] == "}":
                     idx = int(expr[i:j+1].strip("{}"))
-                    ex = tetrad2z3expr(params[idx])
+                    ex = leaf(idx)
                     exs.append(ex)
                     i = j + 1
                     break
         elif expr[i] == "]":
             if ops[-1] == "[":
                 ex = exs.pop()
-                exs.append(Not(ex))                 
+                exs.append(negate(ex))                 
             ops.pop()
             i += 1
         else:
@@ -194,12 +351,19 @@ def trans2expr(expr, params):
         op = ops.pop()
         expr_b = exs.pop()
         expr_a = exs.pop()
-        exs.append(calc(expr_a, expr_b, op))
+        exs.append(combine(expr_a, expr_b, op))
 
     return exs[0] if exs else None
 
 
 def path2z3(path):
+    """Return the parameter names, tetrads, z3 expression, error parameters and logic expression of a path."""
+    pnames, params, expr, error_params, logic = _path2z3(path)
+    return list(pnames), list(params), expr, list(error_params), logic
+
+
+@functools.lru_cache(maxsize=4096)
+def _path2z3(path):
     # path = path.replace(" ", "").replace("='EXIST_FLAG'", "!='None'")
     path = path.replace(" ", "")
     condition_path = path[:path.rfind("->")]
@@ -217,6 +381,22 @@ def path2z3(path):
     return path_pnames, path_params, path_expr, error_params, logic
 
 
+class ParsedPath:
+    """
+    A line of a path file together with what path2z3 makes of it, so that
+    every constraint checked against the path can share one parse. When
+    path2z3 fails, error holds the exception and the other fields are empty.
+    """
+    def __init__(self, text):
+        self.text = text
+        self.error = None
+        try:
+            self.pnames, self.params, self.expr, self.error_params, self.logic = path2z3(text)
+        except Exception as e:
+            self.pnames, self.params, self.expr, self.error_params, self.logic = [], [], None, [], None
+            self.error = e
+
+
 
 
 
@@ -226,6 +406,14 @@ def find_contents_in_parentheses(s):
     return matches
 
 def tetrad2z3expr(tetrad):
+    # the same facts recur on many paths
+    if isinstance(tetrad, tuple):
+        return _tetrad2z3expr(tetrad)
+    return _tetrad2z3expr.__wrapped__(tetrad)
+
+
+@functools.lru_cache(maxsize=65536)
+def _tetrad2z3expr(tetrad):
     if tetrad[0].startswith("call_") or tetrad[0].startswith("list_") or tetrad[0].startswith("dict_"):
         return BoolVal(True)
     op = tetrad[1]
@@ -253,45 +441,45 @@ class tetrad2Expr():
     def equal(self):
         if self.str_val:
             if self.str_val == 'True':
-                return Real(self.var) != 0
+                return SYMBOLS.real(self.var) != 0
             elif self.str_val == 'False':
-                return Real(self.var) == 0
+                return SYMBOLS.real(self.var) == 0
             else:
-                return String(self.var) == StringVal(self.str_val)
+                return SYMBOLS.string(self.var) == SYMBOLS.string_val(self.str_val)
         elif self.nonstr_val:
-            return Real(self.var) == RealVal(self.nonstr_val)
+            return SYMBOLS.real(self.var) == SYMBOLS.real_val(self.nonstr_val)
     
     def notequal(self):
         if self.str_val:
             if self.str_val == 'True':
-                return Real(self.var) == 0
+                return SYMBOLS.real(self.var) == 0
             elif self.str_val == 'False':
-                return Real(self.var) != 0
+                return SYMBOLS.real(self.var) != 0
             else:
-                return String(self.var) != StringVal(self.str_val)
+                return SYMBOLS.string(self.var) != SYMBOLS.string_val(self.str_val)
         elif self.nonstr_val:
-            return Real(self.var) != RealVal(self.nonstr_val)
+            return SYMBOLS.real(self.var) != SYMBOLS.real_val(self.nonstr_val)
 
     def less(self):
         if self.nonstr_val:
-            return Real(self.var) < RealVal(self.nonstr_val)
+            return SYMBOLS.real(self.var) < SYMBOLS.real_val(self.nonstr_val)
         elif self.str_val:
-            return Real(self.var) < Real(self.str_val)
+            return SYMBOLS.real(self.var) < SYMBOLS.real(self.str_val)
 
     def lessequal(self):
         if self.nonstr_val:
-            return Real(self.var) <= RealVal(self.nonstr_val)
+            return SYMBOLS.real(self.var) <= SYMBOLS.real_val(self.nonstr_val)
         elif self.str_val:
-            return Real(self.var) <= Real(self.str_val)
+            return SYMBOLS.real(self.var) <= SYMBOLS.real(self.str_val)
 
     def greater(self):
         if self.nonstr_val:
-            return Real(self.var) > RealVal(self.nonstr_val)
+            return SYMBOLS.real(self.var) > SYMBOLS.real_val(self.nonstr_val)
         elif self.str_val:
-            return Real(self.var) > Real(self.str_val)
+            return SYMBOLS.real(self.var) > SYMBOLS.real(self.str_val)
 
     def greaterequal(self):
         if self.nonstr_val:
-            return Real(self.var) >= RealVal(self.nonstr_val)
+            return SYMBOLS.real(self.var) >= SYMBOLS.real_val(self.nonstr_val)
         elif self.str_val:
-            return Real(self.var) >= Real(self.str_val)
+            return SYMBOLS.real(self.var) >= SYMBOLS.real(self.str_val)
@@ -9,11 +9,11 @@ from tools.macros import RES_DIR
 
 
 
-def process_document(project):
+def process_document(project, info_dir=INFO_DIR):
     if not os.path.exists(RES_DIR):
         os.makedirs(RES_DIR)
 
-    info_path = os.path.join(INFO_DIR, project)
+    info_path = os.path.join(info_dir, project)
     if not os.path.exists(info_path):
         print(f"{project} is not exist, please download and extract info first")
         exit(0)
@@ -44,9 +44,9 @@ def process_document(project):
     for folder in folders:
         if "DS_Store" in folder:
             continue
-        if os.path.exists(f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"):
+        if os.path.exists(f"{info_dir}/{project}/{folder}/{folder}_pa.json"):
             print(f"Calculating constraints ----- {folder}")
-            pa_path = f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"
+            pa_path = f"{info_dir}/{project}/{folder}/{folder}_pa.json"
             with open(pa_path, 'r') as fpa:
                 pa = json.load(fpa)
             fpa.close()
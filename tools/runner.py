@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import queue
+import signal
+import shutil
+import hashlib
+import subprocess as sub
+import pandas as pd
+import tools.cache
+import tools.extractor
+import tools.finder
+import tools.matcher
+import tools.filter
+import tools.translator
+import tools.symexecutor
+import tools.distributor
+import tools.solver
+import tools.auxiliary
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.macros import PROJECT_DIR, LOG_DIR, WORKSPACE_DIR, _DOWNLOAD_DIR
+
+
+def load_benchmark():
+    with open(f"{PROJECT_DIR}/benchmark.json", "r") as f:
+        return json.load(f)
+
+
+def list_experiments():
+    return [item["id"] for item in load_benchmark()]
+
+
+def download_digest(case):
+    h = hashlib.sha256()
+    case_dir = os.path.join(_DOWNLOAD_DIR, case)
+    for root, dirs, files in os.walk(case_dir):
+        dirs.sort()
+        for file in sorted(files):
+            path = os.path.join(root, file)
+            h.update(os.path.relpath(path, case_dir).encode())
+            with open(path, 'rb') as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def group_experiments(cases=None):
+    """
+    Group the cases that only differ in their constraint, so that extraction,
+    translation and symbolic execution run once per group. The downloaded code
+    is part of the key because cases of one benchmark entry may ship different code.
+    """
+    if cases is None:
+        cases = list_experiments()
+    items = {item["id"]: item for item in load_benchmark()}
+    groups = {}
+    for case in cases:
+        item = items[case]
+        key = (item["sha"], item["filepath"], item["class"], item["func"], download_digest(case))
+        groups.setdefault(key, []).append(case)
+    return list(groups.values())
+
+
+def clear_folder(folder_path):
+    if not os.path.exists(folder_path):
+        print(f"Not exist: {folder_path}")
+        return
+
+    for filename in os.listdir(folder_path):
+        file_path = os.path.join(folder_path, filename)
+        try:
+            if os.path.isfile(file_path) or os.path.islink(file_path):
+                os.unlink(file_path)
+            elif os.path.isdir(file_path):
+                shutil.rmtree(file_path)
+        except Exception as e:
+            print(f"Fail to delete {file_path}, the reason is {e}")
+
+
+def experiment_group(case):
+    item = next(item for item in load_benchmark() if item["id"] == case)
+    cases = [other["id"] for other in load_benchmark() if all(other[k] == item[k] for k in ("sha", "filepath", "class", "func"))]
+    return next(group for group in group_experiments(cases) if case in group)
+
+
+def prepare_experiment(case, info_dir, workers=1):
+    clear_folder(os.path.join(info_dir, case))
+    tools.extractor.extract_class_and_independent_function(case, info_dir)
+    tools.finder.find_params_and_attributes(case, info_dir)
+    tools.matcher.match_alignment(case, info_dir)
+    tools.filter.filter_params_and_attributes(case, info_dir)
+    if tools.symexecutor.GOAL_DIRECTED or tools.translator.PIN_PARAMS:
+        # the paths are shared by the whole group, so they must cover the constraints of every case in it
+        tools.distributor.read_from_benchmark(case, info_dir, experiment_group(case))
+    tools.translator.translate_code(case, info_dir)
+    tools.symexecutor.symex(case, info_dir, workers)
+
+
+def check_experiment(case, info_dir):
+    tools.distributor.read_from_benchmark(case, info_dir)
+    verdicts = tools.solver.solve_constraints(case, info_dir)
+    with open(verdict_path(case, info_dir), 'w') as f:
+        json.dump({"id": case, "verdicts": [verdict.to_dict() for verdict in verdicts]}, f, indent=4)
+    return verdicts
+
+
+def verdict_path(case, info_dir):
+    # next to the folder of the case rather than in it, so the solver does not take it for a class
+    return os.path.join(info_dir, f"{case}.verdicts.json")
+
+
+def run_all_experiments(jobs=1, timeout=30, workers=1):
+    """
+    Run every benchmark case on a bounded pool of worker processes.
+    Each worker owns a separate workspace so that cases never share an info directory,
+    and explores the functions of a case on workers symbolic execution processes.
+    """
+    if not os.path.exists(LOG_DIR):
+        os.makedirs(LOG_DIR)
+
+    workspaces = queue.Queue()
+    for k in range(jobs):
+        workspaces.put(os.path.join(WORKSPACE_DIR, f"worker-{k}"))
+
+    def run(group):
+        workspace = workspaces.get()
+        try:
+            run_experiment_group(group, workspace, timeout, workers)
+        finally:
+            workspaces.put(workspace)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(run, group_experiments()))
+
+
+def run_experiment_group(group, workspace, timeout, workers=1):
+    """
+    Prepare the first case of a group once, copy its results to the other
+    cases and check the constraint of every case in a process of its own.
+    The preparation and each check get timeout seconds of their own, so a group
+    of n cases may run for (n + 1) * timeout seconds, and when the preparation
+    times out none of the cases of the group is checked.
+    """
+    if not os.path.exists(workspace):
+        os.makedirs(workspace)
+    first = group[0]
+    print(f"===>>> Preparing experiments {', '.join(group)} ===>>>")
+    prepare_log = os.path.join(workspace, f"{first}.prepare.log")
+    open(prepare_log, 'w').close()
+    prepared = run_main(["--prepareexp", first, "--workers", str(workers)], workspace, prepare_log, timeout)
+    with open(prepare_log, 'r') as f:
+        prepare_output = f.read()
+
+    for case in group:
+        if case != first:
+            shutil.rmtree(os.path.join(workspace, case), ignore_errors=True)
+            if prepared:
+                shutil.copytree(os.path.join(workspace, first), os.path.join(workspace, case))
+
+    for case in group:
+        log_path = os.path.join(LOG_DIR, f"{case}.log")
+        with open(log_path, 'w') as log:
+            log.write(prepare_output)
+        # a verdict file is only left where the check ran to its end
+        result_path = os.path.join(LOG_DIR, f"{case}.verdicts.json")
+        if os.path.exists(result_path):
+            os.remove(result_path)
+        if prepared:
+            print(f"===>>> Running experiment {case} ===>>>")
+            if os.path.exists(verdict_path(case, workspace)):
+                os.remove(verdict_path(case, workspace))
+            run_main(["--checkexp", case], workspace, log_path, timeout)
+            if os.path.exists(verdict_path(case, workspace)):
+                shutil.copyfile(verdict_path(case, workspace), result_path)
+
+
+def run_main(args, workspace, log_path, timeout):
+    """
+    Run main.py with args, appending its output to log_path.
+    Return False if it had to be killed after timeout seconds.
+    """
+    command = [sys.executable, "main.py"] + args + ["--workspace", workspace]
+    if not tools.cache.ENABLED:
+        command.append("--no-cache")
+    if tools.symexecutor.GOAL_DIRECTED:
+        command.append("--goal-directed")
+    if tools.translator.PIN_PARAMS:
+        command.append("--pin-params")
+    if tools.solver.CHECK_MODE != "paths":
+        command.extend(["--check-mode", tools.solver.CHECK_MODE])
+    if tools.auxiliary.ENCODE_STRINGS:
+        command.append("--encode-strings")
+    for name, value in tools.symexecutor.OPTIONS.items():
+        command.append(f"--{name.replace('_', '-')}")
+        if value is not True:
+            command.append(str(value))
+    print(" ".join(command), "\n")
+
+    with open(log_path, 'a') as log:
+        # a new session lets us kill main.py together with the PyExSMT processes it spawned
+        proc = sub.Popen(command, cwd=PROJECT_DIR, stdout=log, stderr=sub.STDOUT, start_new_session=True)
+        try:
+            proc.wait(timeout=timeout)
+        except sub.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.wait()
+            print(f"Timeout: {' '.join(args)}")
+    if proc.returncode == -signal.SIGKILL:
+        with open(log_path, 'a') as log:
+            log.write(f"\nTimeout after {timeout}s\n")
+        return False
+    return True
+
+
+def read_last_line(filepath):
+    with open(filepath, 'rb') as f:
+        try:
+            f.seek(-2, os.SEEK_END)
+            while f.read(1) != b'\n':
+                f.seek(-2, os.SEEK_CUR)
+        except OSError:
+            f.seek(0)
+        return f.readline().decode().strip()
+
+
+def summarize_experiments(log_dir=LOG_DIR):
+    oracles = {item['id']: item['oracle'] for item in load_benchmark()}
+
+    inconsistent = 0
+    consistent = 0
+    fp = 0
+    fn = 0
+
+    result = {}
+    for filename in os.listdir(log_dir):
+        if not filename.endswith(".log"):
+            continue
+        prefix, rest = filename.split('-', 1)
+        id = os.path.splitext(rest)[0]
+        cx = prefix
+
+        result_path = os.path.join(log_dir, f"{cx}-{id}.verdicts.json")
+        if os.path.exists(result_path):
+            with open(result_path, 'r') as f:
+                status = not json.load(f)["verdicts"]
+        else:
+            # logs of runs that did not get to write their verdicts
+            status = not read_last_line(os.path.join(log_dir, filename)).startswith("BAD CONSTRAINT")
+        oracle_value = oracles.get(f"{cx}-{id}")
+
+        if status != (oracle_value.lower() == "true"):
+            if status:
+                status = "FN"
+                fn += 1
+            else:
+                status = "FP"
+                fp += 1
+        else:
+            if status:
+                consistent += 1
+            else:
+                inconsistent += 1
+
+        if cx not in result:
+            result[cx] = {}
+        result[cx][int(id)] = status
+    sorted_keys = sorted(result.keys(), key=lambda x: (x[0], int(x[1:])))
+    df = pd.DataFrame.from_dict({k: result[k] for k in sorted_keys}, orient='index').sort_index(axis=1)
+    df.index.name = "id"
+
+    df.to_excel("result.xlsx")
+
+    print("===>>> Result: ===>>>")
+    print(f"Total: {consistent + inconsistent + fp + fn}")
+    print(f"Consistent: {consistent}")
+    print(f"Inconsistent: {inconsistent}")
+    print(f"False Positive: {fp}")
+    print(f"False Negative: {fn}")
@@ -51,7 +51,7 @@ def similarity(p1, p2):
     # return round((ld1 + opcs + ld2) / 3, 2)
 
 
-def most_sim(tetrad, list):
+def is_exact(tetrad):
     def is_number(s):
         try:
             float(s)
@@ -59,13 +59,19 @@ def most_sim(tetrad, list):
         except ValueError:
             return False
     if is_number(tetrad[3]):
-        return tetrad, 1.0
+        return True
     if tetrad[0] == "batch_size":
-        return tetrad, 1.0
+        return True
     if tetrad[2].startswith("numpy.take("):
-        return tetrad, 1.0
+        return True
     # if tetrad[2] == "True" or tetrad[2] == "False":
-    #     return tetrad, 1.0
+    #     return True
+    return False
+
+
+def most_sim(tetrad, list):
+    if is_exact(tetrad):
+        return tetrad, 1.0
     
     highest_sim = 0
     most_sim_tetrad = None
@@ -79,6 +85,80 @@ def most_sim(tetrad, list):
     return most_sim_tetrad, highest_sim
 
 
+class SimilarityIndex:
+    """
+    The tetrads of a path file prepared for most_sim. The tetrads are
+    deduplicated and their names and values interned, so that the edit
+    distances from a name or value of a constraint to all of them are
+    computed at once with NumPy, and kept for the next parameter with the
+    same name or value. The result is the one most_sim gives.
+    """
+    def __init__(self, tetrads):
+        self.tetrads = tetrads
+        # the first of equal tetrads is the one most_sim picks
+        self.unique = list(dict.fromkeys(tetrads))
+        triples = [(left, op, string_value or non_string_value) for left, op, string_value, non_string_value in self.unique]
+        self.vectorized = bool(triples) and all(op in operator_table for _, op, _ in triples)
+
+        strings = {}
+        for left, _, value in triples:
+            strings.setdefault(left, len(strings))
+            strings.setdefault(value, len(strings))
+        self.name_ids = np.array([strings[left] for left, _, _ in triples], dtype=np.int64)
+        self.value_ids = np.array([strings[value] for _, _, value in triples], dtype=np.int64)
+        self.ops = [op for _, op, _ in triples]
+
+        # the interned strings as rows of code points, padded with -1
+        self.lengths = np.array([len(string) for string in strings], dtype=np.int64)
+        self.codes = np.full((len(strings), max(self.lengths, default=0)), -1, dtype=np.int64)
+        for row, string in enumerate(strings):
+            self.codes[row, :len(string)] = [ord(ch) for ch in string]
+        self.closeness = {}
+
+    def most_sim(self, tetrad):
+        if is_exact(tetrad):
+            return tetrad, 1.0
+        triple = tuple(it for it in tetrad if it)
+        if not self.vectorized or len(triple) < 3 or triple[1] not in operator_table:
+            # leave the errors of malformed tetrads to most_sim
+            return most_sim(tetrad, self.tetrads)
+
+        opcs = np.array([cosine_similarity(operator_table[triple[1]], operator_table[op]) for op in self.ops])
+        sims = 0.25 * self._closeness(triple[0])[self.name_ids] + 0.5 * opcs + 0.25 * self._closeness(triple[2])[self.value_ids]
+        highest_sim = round(sims.max(), 2)
+        if highest_sim <= 0:
+            return None, 0
+        # rounding keeps the order, so the first tetrad that rounds to the maximum is the one most_sim finds
+        for i in np.flatnonzero(sims >= sims.max() - 0.01):
+            if round(sims[i], 2) == highest_sim:
+                return self.unique[i], highest_sim
+
+    def _closeness(self, string):
+        """normalized_levenshtein_distance from string to every interned string"""
+        if string not in self.closeness:
+            distances = levenshtein_distances(string, self.codes, self.lengths)
+            max_lens = np.maximum(len(string), self.lengths)
+            self.closeness[string] = np.where(max_lens == 0, 0.0, 1 - distances / np.maximum(max_lens, 1))
+        return self.closeness[string]
+
+
+def levenshtein_distances(s, codes, lengths):
+    """
+    levenshtein_distance from s to each row of codes, a string of lengths
+    code points padded with -1, computed one row of the table at a time for
+    all of them.
+    """
+    cols = np.arange(codes.shape[1] + 1)
+    prev = np.tile(cols, (len(codes), 1))
+    for i, ch in enumerate(s, 1):
+        cur = np.empty_like(prev)
+        cur[:, 0] = i
+        cur[:, 1:] = np.minimum(prev[:, 1:] + 1, prev[:, :-1] + (codes != ord(ch)))
+        # an insertion costs one more than the cell to its left
+        prev = np.minimum.accumulate(cur - cols, axis=1) + cols
+    return prev[np.arange(len(codes)), lengths]
+
+
 def calc_similarity(a, b, op):
     if op == "^":
         return min(a, b)
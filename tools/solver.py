@@ -1,7 +1,9 @@
 import os
 import re
+import json
 import time
 import tools.parser
+import tools.evaluator
 
 from tools.macros import INFO_DIR
 from tools.auxiliary import *
@@ -17,8 +19,49 @@ import tools.parser
 
 logger = logger_maker()
 
-def solve_constraints(project):
-    project_path = os.path.join(INFO_DIR, project)
+# how a constraint is checked: "paths" asks z3 about one path after the other, "tree" first
+# rules out the subtrees of the path tree PyExSMT writes in which the constraint cannot hold,
+# and "summary" first decides it against the disjunction of all paths
+CHECK_MODE = "paths"
+
+class Verdict:
+    """
+    A constraint that the code of a function contradicts. kind is "normal"
+    when no path satisfies it, "fuzzy" when no path satisfies it by the
+    existence fuzzwords, and "error" when it leads to a path that raises.
+    """
+    def __init__(self, kind, constraint, path_file, path=None):
+        self.kind = kind
+        self.constraint = constraint
+        self.path_file = path_file
+        self.path = path
+        self.library, self.clas, self.memberfunc = path_location(path_file)
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "library": self.library,
+            "class": self.clas,
+            "memberfunc": self.memberfunc,
+            "constraint": self.constraint,
+            "path": self.path,
+            "path_file": self.path_file,
+        }
+
+
+def solve_constraints(project, info_dir=INFO_DIR):
+    """
+    Check the constraints of every class and function of project against
+    their paths. Returns the verdicts found, which is at most the first
+    one: checking stops as soon as a constraint is found to be bad.
+    """
+    # the strings of a project are encoded by an encoder of its own, so what it keeps goes with the call
+    with strings_encoded():
+        return _solve_constraints(project, info_dir)
+
+
+def _solve_constraints(project, info_dir):
+    project_path = os.path.join(info_dir, project)
     
     for folder in os.listdir(project_path):
         try:
@@ -34,16 +77,28 @@ def solve_constraints(project):
                 for memberfunc in os.listdir(memberfunc_path):
                     print(f"{RED}--- Solving memberfunc: {project}/{folder}/{memberfunc}{RESET}")
                     path_file = os.path.join(memberfunc_path, memberfunc, f"{memberfunc}_path.txt")
-                    check_constraints(constraints, path_file)
+                    verdict = check_constraints(constraints, path_file)
+                    if verdict is not None:
+                        log_symbols()
+                        return [verdict]
             else:
                 print(f"{RED}--- Solving func: {project}/{folder}{RESET}")
                 path_file = os.path.join(folder_path, f"{folder}_path.txt")
-                check_constraints(constraints, path_file)
+                verdict = check_constraints(constraints, path_file)
+                if verdict is not None:
+                    log_symbols()
+                    return [verdict]
                 
         except Exception as e:
             print(f"Error processing {folder}: {str(e)}")
             continue
         print("All path files checked.")
+    log_symbols()
+    return []
+
+
+def log_symbols():
+    logger.debug(f"z3 symbol table: {tools.parser.SYMBOLS.stats()}")
 
 def remove_invalid_parentheses(s):
     s = list(s)
@@ -66,7 +121,8 @@ def remove_invalid_parentheses(s):
 
 def check_constraints(constraints, path_file):
     """
-    Check whether constraints are satisfied with the code-constraints
+    Check whether constraints are satisfied with the code-constraints.
+    Returns the Verdict of the first bad constraint, or None.
     """
     print(f"Checking constraints in {constraints}")
     if not constraints:
@@ -78,12 +134,30 @@ def check_constraints(constraints, path_file):
         with open(path_file, 'r') as f:
             paths = f.readlines()
 
-        paths = [remove_invalid_parentheses(path.strip()) for path in paths]
+        paths = [tools.parser.ParsedPath(remove_invalid_parentheses(path.strip())) for path in paths]
         
     except IOError as e:
         logger.error(f"Failed to read path file {path_file}: {str(e)}")
         return
         
+    evaluator = tools.evaluator.GroundEvaluator(paths)
+    # decides paths the evaluator leaves open before they are checked one by one
+    decider = None
+    if CHECK_MODE == "tree":
+        decider = load_tree(path_file, paths)
+    elif CHECK_MODE == "summary":
+        decider = tools.evaluator.PathSummary(paths)
+
+    # the tetrads of all paths, or the first error met parsing them
+    path_tetrads = []
+    tetrads_error = None
+    for p in paths:
+        if p.error is not None:
+            tetrads_error = p.error
+            break
+        path_tetrads.extend(p.params)
+    similarity_index = SimilarityIndex(path_tetrads)
+
     invalid_constraints = []
     
     for idx, constraint in enumerate(constraints, 1):
@@ -93,21 +167,18 @@ def check_constraints(constraints, path_file):
 
         try:
             if is_contain_fuzzwords(constraint):
-                fuzzy_solve(constraint, paths, path_file)
-                return
+                return fuzzy_solve(constraint, paths, path_file, evaluator, decider)
             cons_pnames, cons_params, cons_expr, logic_expr = tools.parser.cons2z3(constraint)
             if contains_symbols(cons_params):
                 logger.debug(f"Skipping constraint with symbols: {constraint}")
                 continue
-            path_tetrads = []
-            for p in paths:
-                _, pathparams, _, _, _ = tools.parser.path2z3(p)
-                path_tetrads.extend(pathparams)
+            if tetrads_error is not None:
+                raise tetrads_error
             cons_sim = []
             modified_cons_params = []
             modified_cons_pnames = []
             for consp in cons_params:
-                most_sim_tetrad, highest_sim = most_sim(consp, path_tetrads)
+                most_sim_tetrad, highest_sim = similarity_index.most_sim(consp)
                 # print(f"most_sim_tetrad: {most_sim_tetrad}")
                 if consp[2] == 'False' or consp[2] == 'True' or consp[2] == 'None':
                     modified_cons_params.append((most_sim_tetrad[0], consp[1], consp[2], consp[3]))
@@ -124,7 +195,9 @@ def check_constraints(constraints, path_file):
                 continue
 
             if not is_contain_fuzzwords(constraint):
-                combine_solve(modified_cons_pnames, modified_cons_expr, modified_cons_params, constraint, paths, path_file)
+                verdict = combine_solve(modified_cons_pnames, modified_cons_expr, modified_cons_params, constraint, paths, path_file, logic_expr, evaluator, decider)
+                if verdict is not None:
+                    return verdict
         except Exception as e:
             invalid_constraints.append(f"{idx}. {constraint}")
             logger.error(f"Failed to process constraint {idx}: {str(e)}")
@@ -134,6 +207,41 @@ def check_constraints(constraints, path_file):
         logger.warning(f"Invalid constraints found:\n" + "\n".join(invalid_constraints))
  
 
+def load_tree(path_file, paths):
+    """Return the PathTree PyExSMT wrote next to path_file, or None when there is none."""
+    tree_file = path_file[:-len("_path.txt")] + "_tree.json"
+    try:
+        with open(tree_file, 'r') as f:
+            tree = json.load(f)
+    except (IOError, ValueError):
+        logger.debug(f"No path tree for {path_file}, checking its paths one by one")
+        return None
+    return tools.evaluator.PathTree(tree, paths, lambda text: remove_invalid_parentheses(text.strip()))
+
+
+def path_location(path_file):
+    """
+    Return the library, class and member function of a path file, with the
+    class None for an independent function, which takes the place of the
+    member function.
+    """
+    # <library>/<class>/memberfunc/<memberfunc>/<memberfunc>_path.txt or <library>/<func>/<func>_path.txt
+    parts = Path(path_file).parts
+    if parts[-3] == "memberfunc":
+        return parts[-5], parts[-4], parts[-2]
+    return parts[-3], None, parts[-2]
+
+
+def print_location(path_file):
+    library, clas, memberfunc = path_location(path_file)
+    print(f"Library: {library}")
+    if clas is not None:
+        print(f"Class: {clas}")
+        print(f"Memberfunc: {memberfunc}")
+    else:
+        print(f"Function: {memberfunc}")
+
+
 def check_array_in_file_list(array, path_file):
     if path_file.endswith("_path.txt"):
         new_filename = path_file[:-9] + ".py"
@@ -168,7 +276,7 @@ def is_nonexistence(text):
     return any("'" +word.lower() + "'" in text_lower for word in words)
 
 
-def fuzzy_solve(constraint, paths, path_file):
+def fuzzy_solve(constraint, paths, path_file, evaluator=None, decider=None):
     # print(f"constraint: {constraint}")
     # print(f"paths: {paths}")
     # print(f"path_file: {path_file}")
@@ -200,7 +308,14 @@ def fuzzy_solve(constraint, paths, path_file):
 
     results = []
     existence_expr = BoolVal(True)
-    for idx, path in enumerate(paths, 1):
+    session = SolverSession(cons_expr)
+    answers = None
+    if evaluator is not None and cons_expr is not None:
+        answers = evaluator.evaluate(logic_expr, cons_params)
+    if decider is not None and cons_expr is not None:
+        answers = decider.evaluate(cons_expr, answers)
+    for idx, parsed in enumerate(paths, 1):
+        path = parsed.text
         if not all(item in path for item in cons_pnames):
             continue
         pos = path.rfind('->')
@@ -230,14 +345,20 @@ def fuzzy_solve(constraint, paths, path_file):
         # print(f"existence_expr: {existence_expr}")
         # print(f"path: {path}")
 
-        try:
-            path_pnames, path_params, path_expr, error_params, path_logic = tools.parser.path2z3(path)
-        except Exception as e:
+        if parsed.error is not None:
             results.append(True)
             continue
+        path_pnames, path_params, path_expr, error_params, path_logic = parsed.pnames, parsed.params, parsed.expr, parsed.error_params, parsed.logic
         # print(f"""\n    {YELLOW}|==>{RESET} [Path #{idx}]: {path}     - Path Parameter Names: {path_pnames}\n     - Path Parameters: {path_params}\n     - Path Expression: {path_expr}\n     - Error_Params: {error_params}\n     - Logic: {path_logic}\n""")
         fuzzy = True
-        results = strategy1(path, results, path_pnames, cons_params, cons_pnames, error_params, path_params, cons_expr, path_expr, existence_expr, path_file, constraint, fuzzy)
+        ground = None
+        if answers is not None and not is_false(existence_expr):
+            ground = answers[idx - 1]
+        elif answers is not None:
+            ground = tools.evaluator.UNSAT
+        results, verdict = strategy1(path, results, path_pnames, cons_params, cons_pnames, error_params, path_params, cons_expr, path_expr, existence_expr, path_file, constraint, fuzzy, session, ground)
+        if verdict is not None:
+            return verdict
 
 
     print(f"normal results: {results}")
@@ -245,23 +366,16 @@ def fuzzy_solve(constraint, paths, path_file):
         print("\n")
         print(f"{RED}[ BAD CONSTRAINT WITH FUZZY ]{RESET}")
         print("#"*50)
-        parts = Path(path_file).parts
-        idx = parts.index("info")
-        print(f"Library: {parts[idx+1]}")
-        if parts[idx+3] and parts[idx+3] == "memberfunc":
-            print(f"Class: {parts[idx+2]}")
-            print(f"Memberfunc: {parts[idx+4]}")
-        else:
-            print(f"Function: {parts[idx+2]}")
+        print_location(path_file)
         print(f"Constraint: {constraint}")
         print(f"path file: {path_file}")
         print("#"*50)
         print("\n")
         print("BAD CONSTRAINT")
-        exit(0)
+        return Verdict("fuzzy", constraint, path_file)
 
 
-def combine_solve(cons_pnames, cons_expr, cons_params, constraint, paths, path_file):
+def combine_solve(cons_pnames, cons_expr, cons_params, constraint, paths, path_file, logic_expr=None, evaluator=None, decider=None):
     if len(cons_params) <= 1:
         return
     if not check_array_in_file_list(cons_pnames, path_file):
@@ -269,41 +383,56 @@ def combine_solve(cons_pnames, cons_expr, cons_params, constraint, paths, path_f
     print("Starting to solve the constraint===>>>")
     results = []
     existence_expr = BoolVal(True)
-    for idx, path in enumerate(paths, 1):
-        try:
-            path_pnames, path_params, path_expr, error_params, path_logic = tools.parser.path2z3(path)
-        except Exception as e:
+    session = SolverSession(cons_expr)
+    answers = None
+    if evaluator is not None and cons_expr is not None:
+        answers = evaluator.evaluate(logic_expr, cons_params)
+    if decider is not None and cons_expr is not None:
+        answers = decider.evaluate(cons_expr, answers)
+    for idx, parsed in enumerate(paths, 1):
+        path = parsed.text
+        if parsed.error is not None:
             results.append(True)
             continue
+        path_pnames, path_params, path_expr, error_params, path_logic = parsed.pnames, parsed.params, parsed.expr, parsed.error_params, parsed.logic
         # print(f"""\n    {YELLOW}|==>{RESET} [Path #{idx}]: {path}""")
         # print(f"""\n    {YELLOW}|==>{RESET} [Path #{idx}]: {path}     - Path Parameter Names: {path_pnames}\n     - Path Parameters: {path_params}\n     - Path Expression: {path_expr}\n     - Error_Params: {error_params}\n     - Logic: {path_logic}\n""")
-        results = strategy1(path, results, path_pnames, cons_params, cons_pnames, error_params, path_params, cons_expr, path_expr, existence_expr, path_file, constraint, fuzzy=False)
+        ground = answers[idx - 1] if answers is not None else None
+        results, verdict = strategy1(path, results, path_pnames, cons_params, cons_pnames, error_params, path_params, cons_expr, path_expr, existence_expr, path_file, constraint, fuzzy=False, session=session, ground=ground)
+        if verdict is not None:
+            return verdict
 
     print(f"normal results: {results}")
     if results and not any(results):
         print("\n")
         print(f"{RED}[ BAD CONSTRAINT ]{RESET}")
         print("#"*50)
-        parts = Path(path_file).parts
-        idx = parts.index("info")
-        print(f"Library: {parts[idx+1]}")
-        if parts[idx+3] and parts[idx+3] == "memberfunc":
-            print(f"Class: {parts[idx+2]}")
-            print(f"Memberfunc: {parts[idx+4]}")
-        else:
-            print(f"Function: {parts[idx+2]}")
+        print_location(path_file)
         print(f"Constraint: {constraint}")
         print(f"path file: {path_file}")
         print("#"*50)
         print("\n")
         print("BAD CONSTRAINT")
-        exit(0)
+        return Verdict("normal", constraint, path_file)
+
 
 
 
 
+def strategy1(path, results, path_pnames, cons_params, cons_pnames, error_params, path_params, cons_expr, path_expr, existence_expr, path_file, constraint, fuzzy=False, session=None, ground=None):
+    """
+    Add the result of path to results. Returns them with the Verdict of an error path the constraint leads to, if any.
+    ground is what the GroundEvaluator found for the constraint on the path, if it found anything.
+    """
+    # one session per constraint and function keeps z3's work on the constraint across paths
+    if session is None:
+        session = SolverSession(cons_expr)
+
+    def solve_path():
+        if ground is not None and ground != tools.evaluator.UNKNOWN:
+            return bool(ground == tools.evaluator.SAT)
+        return session.solve(And(path_expr, existence_expr))
 
-def strategy1(path, results, path_pnames, cons_params, cons_pnames, error_params, path_params, cons_expr, path_expr, existence_expr, path_file, constraint, fuzzy=False):
     # print(f"cons_pnames: {cons_pnames}")
     # print(f"path_pnames: {path_pnames}")
     if all(cp in path_pnames for cp in cons_pnames):
@@ -319,34 +448,27 @@ def strategy1(path, results, path_pnames, cons_params, cons_pnames, error_params
                     else:
                         err_path_expr = And(err_path_expr, err_expr)
                 # print(f"expr: {And(And(cons_expr, err_path_expr), existence_expr)}")
-                results.append(not solve_expr(And(And(cons_expr, path_expr), existence_expr)))
-                if solve_expr(And(And(cons_expr, err_path_expr), existence_expr)):
+                results.append(not solve_path())
+                if session.solve(And(err_path_expr, existence_expr)):
                     print("\n")
                     print(f"{RED}[ BAD CONSTRAINT WITH ERROR ]{RESET}")
                     print("#"*50)
                     print(f"Type: Raise Error")
                     print(f"path: {path}")
-                    parts = Path(path_file).parts
-                    idx = parts.index("info")
-                    print(f"Library: {parts[idx+1]}")
-                    if parts[idx+3] and parts[idx+3] == "memberfunc":
-                        print(f"Class: {parts[idx+2]}")
-                        print(f"Memberfunc: {parts[idx+4]}")
-                    else:
-                        print(f"Function: {parts[idx+2]}")
+                    print_location(path_file)
                     print(f"Constraint: {constraint}")
                     print(f"path file: {path_file}")
                     print("#"*50)
                     print("\n")
                     print("BAD CONSTRAINT")
-                    exit(0)
+                    return results, Verdict("error", constraint, path_file, path)
         else:
-            results.append(solve_expr(And(And(cons_expr, path_expr), existence_expr)))
+            results.append(solve_path())
     else:
         # print(f"flaggg")
         # results.append(solve_expr(And(And(cons_expr, path_expr), existence_expr)))
         results.append(False)
-    return results
+    return results, None
 
 def strategy2(results, path_pnames, cons_pnames, error_params, path_params, cons_expr, path_expr, existence_expr):
     if all(cp in path_pnames for cp in cons_pnames):
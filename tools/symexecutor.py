@@ -1,25 +1,91 @@
-import os 
-import subprocess as sub
+import os
+import io
+import ast
+import sys
+import time
+import queue
+import traceback
+import importlib.util
+import contextlib
+import multiprocessing
+import tools.cache
+from tools.auxiliary import constraint_params, resembles
+from concurrent.futures import ThreadPoolExecutor
 
-from tools.macros import INFO_DIR, PYEXECUTOR
+from tools.macros import INFO_DIR, PYEXSMT_DIR, PYEXECUTOR, SYMEX_WORKER_JOBS
 
 
-def symex(project):
-    for root, dirs, files in os.walk(f"{INFO_DIR}/{project}"):
+# keyword arguments for the run function of PyExSMT, set from the command line
+OPTIONS = {}
+# only negate branches on the parameters that the documented constraints talk about
+GOAL_DIRECTED = False
+# also write the paths as a tree of their shared prefixes, for the solver's tree check mode
+TREE = False
+
+
+def symex(project, info_dir=INFO_DIR, workers=1):
+    jobs = []
+    for root, dirs, files in os.walk(f"{info_dir}/{project}"):
         for file in files:
             if file.endswith('_trans.py'):
-                single_symex(root, file)
+                jobs.append((root, file))
+
+    # the workers start importing before the first job, and before the threads that hand out the jobs exist
+    pool = queue.Queue()
+    for _ in range(workers):
+        worker = SymexWorker()
+        worker.start()
+        pool.put(worker)
+
+    def run(job):
+        worker = pool.get()
+        try:
+            single_symex(*job, worker)
+        finally:
+            pool.put(worker)
 
-def single_symex(root, file):
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(run, jobs))
+    finally:
+        while not pool.empty():
+            pool.get().close()
+
+def single_symex(root, file, worker):
     entryfunc = file[:-9]
     log_path = f"{root}/{entryfunc}_path.txt"
+    tree_path = f"{root}/{entryfunc}_tree.json"
+    if os.path.exists(tree_path):
+        os.remove(tree_path)
     print(f"path: {log_path}")
-    command = f"python3 {PYEXECUTOR} --path {root}/{file} --entry {entryfunc}"
-    print(command)
-    try:
-        sub.run(command, shell=True, stdout=open(log_path, 'w'), stderr=sub.STDOUT, timeout=30)
-    except:
+    options = dict(OPTIONS)
+    if GOAL_DIRECTED:
+        relevant = relevant_params(root, file)
+        if relevant is not None:
+            print(f"relevant: {relevant}")
+            options["relevant"] = relevant
+    key = tools.cache.make_key("symex", entryfunc, tools.cache.read_text(f"{root}/{file}"), sorted(options.items()))
+    tree_key = tools.cache.make_key("symex", "tree", key)
+    cached = tools.cache.load("symex", key)
+    cached_tree = tools.cache.load("symex", tree_key) if TREE else ""
+    if cached is not None and cached_tree is not None:
+        with open(log_path, 'w') as fw:
+            fw.write(cached)
+        if cached_tree:
+            with open(tree_path, 'w') as fw:
+                fw.write(cached_tree)
+        return
+
+    # leave the worker time to report the paths it found within its time budget
+    time_budget = options.get("time_budget", 0)
+    start = time.monotonic()
+    # the tree goes next to the paths, so it is no part of the key
+    run_options = dict(options, tree=tree_path) if TREE else options
+    timeout = not worker.explore(f"{root}/{file}", entryfunc, log_path, run_options, timeout=max(30, time_budget + 5))
+    if timeout:
         print("Timeout")
+        with open(log_path, 'w') as fw:
+            pass
 
     if not os.path.exists(log_path):
         with open(log_path, 'w') as f:
@@ -31,4 +97,109 @@ def single_symex(root, file):
     if first_line.startswith('Traceback'):
         with open(log_path, 'w') as fw:
             pass
-        fw.close()
\ No newline at end of file
+        fw.close()
+    if (timeout or first_line.startswith('Traceback')) and os.path.exists(tree_path):
+        os.remove(tree_path)
+
+    # a timed out run depends on the load of the machine, so it is not worth keeping
+    if not timeout and not (time_budget and time.monotonic() - start >= time_budget):
+        tools.cache.store("symex", key, tools.cache.read_text(log_path))
+        if TREE:
+            tools.cache.store("symex", tree_key, tools.cache.read_text(tree_path))
+
+
+def relevant_params(root, file):
+    """
+    Return the parameters of the translated function that resemble a
+    parameter of the constraints of its class or function, or None when
+    there are no constraints to go by.
+    """
+    folder = os.path.dirname(os.path.dirname(root)) if os.path.basename(os.path.dirname(root)) == "memberfunc" else root
+    names = constraint_params(folder)
+    if not names:
+        return None
+
+    with open(f"{root}/{file}", 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    params = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == file[:-9]:
+            params = [arg.arg for arg in node.args.args]
+
+    return sorted(p for p in params if any(resembles(n, p) for n in names))
+
+
+# a worker replaced while jobs are handed out must not be forked from a thread of this process,
+# which may hold the lock of a z3 context, so workers are forked from a server process instead
+CONTEXT = multiprocessing.get_context("forkserver")
+
+
+class SymexWorker:
+    """
+    A process that has PyExSMT, z3 and pySMT imported already and explores
+    one translated function after the other, so that symbolic execution does
+    not pay for interpreter startup and imports on every function.
+    """
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.jobs = 0
+
+    def start(self):
+        self.conn, child_conn = CONTEXT.Pipe()
+        self.process = CONTEXT.Process(target=serve, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def explore(self, path, entry, log_path, options={}, timeout=30):
+        """
+        Write the paths of entry in path to log_path.
+        Returns False if the worker had to be killed after timeout seconds.
+        """
+        if self.process is None or not self.process.is_alive() or self.jobs >= SYMEX_WORKER_JOBS:
+            self.close()
+            self.start()
+        self.jobs += 1
+        self.conn.send((path, entry, log_path, options))
+        try:
+            if self.conn.poll(timeout):
+                self.conn.recv()
+                return True
+        except EOFError:
+            print(f"Worker died while exploring {path}")
+        self.close()
+        return False
+
+    def close(self):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process = None
+
+
+def serve(conn):
+    sys.path.insert(0, PYEXSMT_DIR)
+    spec = importlib.util.spec_from_file_location("pyexsmt_main", PYEXECUTOR)
+    pyexsmt_main = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pyexsmt_main)
+
+    while True:
+        try:
+            path, entry, log_path, options = conn.recv()
+        except EOFError:
+            return
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                pyexsmt_main.run(path, entry, path=True, **options)
+            except BaseException:
+                traceback.print_exc()
+        # the command line tool buffers its output but not its errors, so errors come first
+        with open(log_path, 'w') as f:
+            f.write(err.getvalue())
+            f.write(out.getvalue())
+        conn.send(True)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tools are imported as a package of the project directory, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -0,0 +1,84 @@
+import os
+import gzip
+import json
+
+import pytest
+from z3 import Solver, And, sat
+
+import tools.auxiliary
+import tools.solver
+from tools.evaluator import SAT, UNSAT, UNKNOWN, GroundEvaluator, PathSummary
+from tools.parser import ParsedPath, cons2z3
+
+# the files the solver reads for 30 prepared benchmark cases, and the kinds of the verdicts
+# they got when their paths were checked one by one
+CASES = os.path.join(os.path.dirname(__file__), "data", "checks.json.gz")
+
+PATHS = [
+    "(a = 1) -> (b = 'x') -> 'ok'",
+    "(a != 1) -> 'no'",
+    "(a = 1) -> (b != 'x') -> 'ok'",
+    # not a conjunction of = and != facts, so left to z3
+    "(c > 2) -> 'big'",
+    # facts that contradict each other
+    "(a = 1) -> (a = 2) -> 'ok'",
+]
+
+
+def evaluate(constraint):
+    pnames, params, expr, logic = cons2z3(constraint)
+    return GroundEvaluator([ParsedPath(path) for path in PATHS]).evaluate(logic, params).tolist()
+
+
+def test_ground_evaluator_decides_facts():
+    assert evaluate("(a = 1) -> (b = 'x')") == [SAT, UNSAT, UNSAT, UNKNOWN, UNSAT]
+    assert evaluate("(a = 1) && (b != 'x')") == [UNSAT, UNSAT, SAT, UNKNOWN, UNSAT]
+
+
+def test_ground_evaluator_is_three_valued():
+    # no path says anything about d, so d = 3 is unknown on all of them
+    assert evaluate("(d = 3)") == [UNKNOWN, UNKNOWN, UNKNOWN, UNKNOWN, UNSAT]
+    # true or unknown is true, false or unknown is unknown
+    assert evaluate("(a = 1) || (d = 3)") == [SAT, UNKNOWN, SAT, UNKNOWN, UNSAT]
+    # true and unknown is unknown, false and unknown is false
+    assert evaluate("(a = 1) && (d = 3)") == [UNKNOWN, UNSAT, UNKNOWN, UNKNOWN, UNSAT]
+    # the negation of unknown is unknown
+    assert evaluate("!(d = 3) || (b = 'x')") == [SAT, UNKNOWN, UNKNOWN, UNKNOWN, UNSAT]
+
+
+def test_path_summary_agrees_with_z3():
+    paths = [ParsedPath(path) for path in PATHS]
+    for constraint in ("(a = 1) -> (b = 'x')", "(c = 1)", "(c > 5) && (a != 1)"):
+        cons_expr = cons2z3(constraint)[2]
+        for row, answer in enumerate(PathSummary(paths).evaluate(cons_expr)):
+            if answer == UNKNOWN:
+                continue
+            solver = Solver()
+            solver.add(And(cons_expr, paths[row].expr))
+            assert (solver.check() == sat) == (answer == SAT), (constraint, PATHS[row])
+
+
+def write_cases(workspace):
+    with gzip.open(CASES, "rt") as f:
+        cases = json.load(f)
+    for case, fixture in cases.items():
+        for name, text in fixture["files"].items():
+            path = os.path.join(workspace, case, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+    return {case: fixture["kinds"] for case, fixture in cases.items()}
+
+
+def test_check_modes_give_the_same_verdicts(tmp_path, monkeypatch):
+    workspace = str(tmp_path)
+    kinds = write_cases(workspace)
+    verdicts = {}
+    for mode in ("paths", "tree", "summary"):
+        for encode in (False, True):
+            monkeypatch.setattr(tools.solver, "CHECK_MODE", mode)
+            monkeypatch.setattr(tools.auxiliary, "ENCODE_STRINGS", encode)
+            for case in kinds:
+                found = [verdict.to_dict() for verdict in tools.solver.solve_constraints(case, workspace)]
+                assert [verdict["kind"] for verdict in found] == kinds[case], (mode, encode, case)
+                assert verdicts.setdefault(case, found) == found, (mode, encode, case)
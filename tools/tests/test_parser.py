@@ -0,0 +1,74 @@
+import os
+import gzip
+import json
+
+import pytest
+
+from tools.parser import TETRAD, cons2z3, fold_logic, parse_logic, scan_constraint
+
+# what cons2z3 gave for the constraints and path conditions the solver parses on the
+# prepared benchmark cases, before it read them in one pass
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "cons2z3.json.gz")
+
+
+def load_corpus():
+    with gzip.open(CORPUS, "rt") as f:
+        return json.load(f)
+
+
+def test_cons2z3_matches_corpus():
+    for case in load_corpus():
+        constraint = case["constraint"]
+        if "error" in case:
+            with pytest.raises(Exception) as error:
+                cons2z3(constraint)
+            assert type(error.value).__name__ == case["error"], constraint
+            continue
+        pnames, params, expr, logic = cons2z3(constraint)
+        assert pnames == case["pnames"], constraint
+        assert [list(p) for p in params] == case["params"], constraint
+        assert expr.sexpr() == case["expr"], constraint
+        assert logic == case["logic"], constraint
+
+
+def test_cons2z3_quotes_literals():
+    pnames, params, expr, logic = cons2z3("(a = None) -> (b != \"True\")")
+    assert pnames == ["a", "b"]
+    assert params == [("a", "=", "None", ""), ("b", "!=", "True", "")]
+    assert logic == "{0}^{1}"
+
+
+def test_cons2z3_reads_escaped_quotes():
+    # the way PyExSMT prints a string literal with an apostrophe in a path
+    pnames, params, expr, logic = cons2z3("(s = 'it\\'s') -> (r != 'don\\'t')")
+    assert pnames == ["s", "r"]
+    assert params == [("s", "=", "it\\'s", ""), ("r", "!=", "don\\'t", "")]
+    assert logic == "{0}^{1}"
+
+
+def test_scan_constraint():
+    matches, logic = scan_constraint("!(a = 1) && (b = 2 || c = 3) -> d", TETRAD)
+    assert [m[0] for m in matches] == ["a", "b", "c"]
+    assert logic == "[{}]^({}|{})^d"
+
+
+def test_scan_constraint_replaces_once():
+    # what a replacement gives is not replaced again
+    assert scan_constraint("((a = 1))", TETRAD)[1] == "({})"
+    assert scan_constraint("|||", TETRAD)[1] == "||"
+    assert scan_constraint("&&&", TETRAD)[1] == "^&"
+
+
+def test_parse_logic():
+    assert parse_logic("{0}^({1}|[{2}])") == ((0, ("(", ((1, ("[", ((2,), ()))), ("|",)))), ("^",))
+
+
+@pytest.mark.parametrize("expr", ["", "({0}", "{0}^", "{0}{1}", "{0}^x"])
+def test_parse_logic_rejects(expr):
+    with pytest.raises(ValueError):
+        parse_logic(expr)
+
+
+def test_fold_logic_nests_to_the_right():
+    folded = fold_logic("{0}^{1}|[{2}]", str, lambda a, b, op: f"({a}{op}{b})", lambda a: f"!{a}")
+    assert folded == "(0^(1|!2))"
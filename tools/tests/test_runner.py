@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+import tools.runner
+from tools.runner import group_experiments, run_main
+
+
+def entry(case, func, sha="abc"):
+    return {"id": case, "sha": sha, "filepath": "sklearn/cluster.py", "class": "", "func": func}
+
+
+def write_download(root, case, source):
+    os.makedirs(os.path.join(root, case))
+    with open(os.path.join(root, case, "cluster.py"), "w") as f:
+        f.write(source)
+
+
+def test_group_experiments(tmp_path, monkeypatch):
+    benchmark = [
+        entry("c1-1", "k_means"),
+        entry("c1-2", "k_means"),
+        entry("c1-3", "k_means"),
+        entry("c2-1", "dbscan"),
+        entry("c3-1", "k_means", sha="def"),
+    ]
+    monkeypatch.setattr(tools.runner, "load_benchmark", lambda: benchmark)
+    monkeypatch.setattr(tools.runner, "_DOWNLOAD_DIR", str(tmp_path))
+    for case in ("c1-1", "c1-2", "c2-1", "c3-1"):
+        write_download(tmp_path, case, "def k_means(X): pass\n")
+    # same entry, but the code downloaded for it differs
+    write_download(tmp_path, "c1-3", "def k_means(X, n): pass\n")
+
+    assert group_experiments() == [["c1-1", "c1-2"], ["c1-3"], ["c2-1"], ["c3-1"]]
+    assert group_experiments(["c1-2", "c2-1", "c1-1"]) == [["c1-2", "c1-1"], ["c2-1"]]
+
+
+def write_main(project_dir, body):
+    with open(os.path.join(project_dir, "main.py"), "w") as f:
+        f.write("import sys, time, subprocess\n" + body)
+
+
+def test_run_main_returns_when_done(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools.runner, "PROJECT_DIR", str(tmp_path))
+    write_main(tmp_path, "print(' '.join(sys.argv[1:]))\n")
+    log_path = tmp_path / "case.log"
+
+    assert run_main(["--checkexp", "c1-1"], "ws", str(log_path), 30)
+    assert log_path.read_text().splitlines()[0] == "--checkexp c1-1 --workspace ws"
+
+
+def test_run_main_kills_processes_it_spawned(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools.runner, "PROJECT_DIR", str(tmp_path))
+    # like main.py spawning the PyExSMT processes, the child outlives a kill of its parent alone
+    write_main(tmp_path, (
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        "print(child.pid, flush=True)\n"
+        "time.sleep(60)\n"
+    ))
+    log_path = tmp_path / "case.log"
+
+    start = time.monotonic()
+    assert not run_main(["--prepareexp", "c1-1"], "ws", str(log_path), 2)
+    assert time.monotonic() - start < 30
+    lines = log_path.read_text().splitlines()
+    assert lines[-1] == "Timeout after 2s"
+    child = int(lines[0])
+    # the child is reparented and reaped by init once killed, or left a zombie for a moment
+    for _ in range(50):
+        try:
+            with open(f"/proc/{child}/stat") as f:
+                if f.read().split(")")[-1].split()[0] == "Z":
+                    break
+        except FileNotFoundError:
+            break
+        time.sleep(0.1)
+    else:
+        raise AssertionError(f"process {child} is still running")
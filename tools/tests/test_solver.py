@@ -0,0 +1,22 @@
+from tools.solver import Verdict, path_location, print_location
+
+
+def test_path_location_of_member_function():
+    path_file = "/ws/c1-1/KBinsDiscretizer/memberfunc/fit/fit_path.txt"
+    assert path_location(path_file) == ("c1-1", "KBinsDiscretizer", "fit")
+
+
+def test_path_location_of_function():
+    path_file = "/ws/c31-1/spectral_clustering/spectral_clustering_path.txt"
+    assert path_location(path_file) == ("c31-1", None, "spectral_clustering")
+
+
+def test_print_location_matches_verdict(capsys):
+    path_file = "/ws/c1-1/KBinsDiscretizer/memberfunc/fit/fit_path.txt"
+    verdict = Verdict("normal", "(a = 1) -> (b = 2)", path_file)
+    print_location(path_file)
+    assert capsys.readouterr().out.splitlines() == [
+        f"Library: {verdict.library}",
+        f"Class: {verdict.clas}",
+        f"Memberfunc: {verdict.memberfunc}",
+    ]
@@ -1,11 +1,13 @@
 import os
 import re
+import ast
 import json
 import libcst as cst
-
+import tools.cache
 
 from tools.macros import INFO_DIR
 from tools.macros import FLAG
+from tools.auxiliary import constraint_params, resembles
 
 import tools.modifier.FindInputParams
 import tools.modifier.RemoveDetails
@@ -21,9 +23,12 @@ import tools.modifier.FormatErrorReturn
 import tools.modifier.LoopToIfTransformer
 import tools.modifier.MultiAssignment
 
-def translate_code(project):
+# pin the documented parameters that no constraint talks about to their default values
+PIN_PARAMS = False
+
+def translate_code(project, info_dir=INFO_DIR):
     call_times = 0
-    info_path = os.path.join(INFO_DIR, project)
+    info_path = os.path.join(info_dir, project)
     if not os.path.exists(info_path):
         print(f"{project}'s info files is not exist, please extract info first")
     folders = os.listdir(info_path)
@@ -31,7 +36,7 @@ def translate_code(project):
         if "DS_Store" in folder:
             continue
         try:
-            call_times = translate_functions(project, folder, call_times)
+            call_times = translate_functions(project, folder, call_times, info_dir)
         except SyntaxError as e:
             if "non-default argument follows default argument" in str(e):
                 print(f"\n\nfunc:{folder}:\npath:{info_path}\n{e}\n\n")
@@ -39,19 +44,19 @@ def translate_code(project):
                 raise
     print(f"total call times: {call_times}")
 
-def translate_functions(project, folder, call_times):
-    if os.path.exists(f"{INFO_DIR}/{project}/{folder}/memberfunc"):
-        memberfunc_folders = os.listdir(f"{INFO_DIR}/{project}/{folder}/memberfunc")
+def translate_functions(project, folder, call_times, info_dir=INFO_DIR):
+    if os.path.exists(f"{info_dir}/{project}/{folder}/memberfunc"):
+        memberfunc_folders = os.listdir(f"{info_dir}/{project}/{folder}/memberfunc")
         for memberfunc in memberfunc_folders:
             if "DS_Store" in memberfunc:
                 continue
             print(f"Translating Class: {folder}; Function: {memberfunc}")
             call_times+=1
             try:
-                translate_single_function(project, folder, memberfunc)
+                translate_single_function(project, folder, memberfunc, info_dir)
             except Exception as e:
                 print(f"Useless Constraint ---- {str(e)}")    
-            trans_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_trans.py"
+            trans_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_trans.py"
             if not os.path.exists(trans_path):
                 with open(trans_path, 'w') as fw:
                     pass
@@ -60,10 +65,10 @@ def translate_functions(project, folder, call_times):
         print(f"Translating Independent Function: {folder}")
         call_times+=1
         try:
-            translate_single_function(project, folder, None)
+            translate_single_function(project, folder, None, info_dir)
         except Exception as e:
             print(f"Useless Constraint ---- {str(e)}")
-        trans_path = f"{INFO_DIR}/{project}/{folder}/{folder}_trans.py"
+        trans_path = f"{info_dir}/{project}/{folder}/{folder}_trans.py"
         if not os.path.exists(trans_path):
             with open(trans_path, 'w') as fw:
                 pass
@@ -71,17 +76,17 @@ def translate_functions(project, folder, call_times):
     return call_times
     
 
-def translate_single_function(project, folder, memberfunc):
+def translate_single_function(project, folder, memberfunc, info_dir=INFO_DIR):
     if memberfunc:
-        func_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}.py"
-        pa_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"
-        trans_path = f"{INFO_DIR}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_trans.py"
-        parent_pa_path = f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"
+        func_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}.py"
+        pa_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_pa.json"
+        trans_path = f"{info_dir}/{project}/{folder}/memberfunc/{memberfunc}/{memberfunc}_trans.py"
+        parent_pa_path = f"{info_dir}/{project}/{folder}/{folder}_pa.json"
         func = memberfunc
     else:
-        func_path = f"{INFO_DIR}/{project}/{folder}/{folder}.py"
-        pa_path = f"{INFO_DIR}/{project}/{folder}/{folder}_pa.json"
-        trans_path = f"{INFO_DIR}/{project}/{folder}/{folder}_trans.py"
+        func_path = f"{info_dir}/{project}/{folder}/{folder}.py"
+        pa_path = f"{info_dir}/{project}/{folder}/{folder}_pa.json"
+        trans_path = f"{info_dir}/{project}/{folder}/{folder}_trans.py"
         parent_pa_path = f""
         func = folder
 
@@ -90,6 +95,15 @@ def translate_single_function(project, folder, memberfunc):
         source = f.read()
     f.close()
 
+    constraint_names = constraint_params(f"{info_dir}/{project}/{folder}") if PIN_PARAMS else set()
+    key = tools.cache.make_key("translate", func, source, tools.cache.read_text(pa_path), tools.cache.read_text(parent_pa_path),
+                               sorted(constraint_names))
+    cached = tools.cache.load("translate", key)
+    if cached is not None:
+        with open(trans_path, 'w') as fw:
+            fw.write(cached)
+        return
+
     source, input_params = tools.modifier.FindInputParams.extract_function_params(source)
     source = tools.modifier.RemoveDetails.remove_details(source)
     source = tools.modifier.SimplifyTernaryOperator.modify_ternary(source)
@@ -107,11 +121,13 @@ def translate_single_function(project, folder, memberfunc):
     undefined_variables = tools.modifier.UndefinedVariableCollector.undef_var_collector(source)
 
     params = []
+    descriptions = {}
     if os.path.exists(pa_path):
         with open(pa_path, 'r') as fpa:
             pa_json = json.load(fpa)
         fpa.close()
         params = list(pa_json["pa"].keys())
+        descriptions.update(pa_json["pa"])
 
 
     parent_params = []
@@ -120,6 +136,7 @@ def translate_single_function(project, folder, memberfunc):
             parent_pa_json = json.load(fppa)
         fppa.close()
         parent_params = list(parent_pa_json["pa"].keys())
+        descriptions.update(parent_pa_json["pa"])
 
     def merge_and_deduplicate(*lists):
         merged_set = set()
@@ -173,9 +190,23 @@ def translate_single_function(project, folder, memberfunc):
             split_code[-2] = ''
     source = '\n'.join(split_code)
 
+    if constraint_names:
+        concrete_args = {}
+        for param in merged_params:
+            if param in descriptions and not any(resembles(name, param) for name in constraint_names):
+                default = docstring_default(descriptions[param])
+                if default is not None:
+                    concrete_args[param] = default
+        if concrete_args:
+            # picked up by the loader of PyExSMT like the @concrete decorator; the names are
+            # keywords rather than strings, which PyExSMT would replace by numbers
+            pins = ", ".join(f"{param}={value!r}" for param, value in sorted(concrete_args.items()))
+            source = source.strip() + f"\n\n{func}.concrete_args = dict({pins})"
+
     with open(trans_path, 'w') as fw:
         fw.write(source.strip())
     fw.close()
+    tools.cache.store("translate", key, source.strip())
 
     def replace_call_pattern(file_path):
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -186,4 +217,28 @@ def translate_single_function(project, folder, memberfunc):
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(replaced_content)
 
-    # replace_call_pattern(trans_path)
\ No newline at end of file
+    # replace_call_pattern(trans_path)
+
+
+def docstring_default(description):
+    """
+    Return the default value given in the docstring description of a
+    parameter as the translated code compares it, or None when there is
+    none or it cannot be represented by a concrete integer or string.
+    """
+    match = re.search(r"default\s*=\s*(\S+)", description)
+    if match is None:
+        return None
+    try:
+        value = ast.literal_eval(match.group(1).rstrip(".,;)"))
+    except (ValueError, SyntaxError):
+        return None
+    # None and booleans are compared as in the translated code, floats would
+    # not mix with the symbolic integers of the other parameters
+    if value is None:
+        return 'None'
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, str)):
+        return value
+    return None